@@ -5,4 +5,5 @@ from .dodecaSkyMap import *
 from .equatSkyMap import *
 from .discreteSkyMap import *
 from .skyMapRegistry import *
+from .tractPatchAssigner import *
 from .version import *
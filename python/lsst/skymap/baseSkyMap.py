@@ -29,6 +29,8 @@ __all__ = ["BaseSkyMapConfig", "BaseSkyMap"]
 import hashlib
 import struct
 
+import numpy
+
 import lsst.geom as geom
 import lsst.pex.config as pexConfig
 from lsst.geom import SpherePoint, Angle, arcseconds, degrees
@@ -112,6 +114,8 @@ class BaseSkyMap:
             rotation=Angle(self.config.rotation, degrees),
         )
         self._sha1 = None
+        self._tractCenterIndex = None
+        self._tractCapIndex = None
 
     def findTract(self, coord):
         """Find the tract whose center is nearest the specified coord.
@@ -126,25 +130,225 @@ class BaseSkyMap:
         result : `TractInfo`
             TractInfo of tract whose center is nearest the specified coord.
 
+        Raises
+        ------
+        LookupError
+            If no tract can be found for the coord.
+
         Notes
         -----
         - If coord is equidistant between multiple sky tract centers then one
           is arbitrarily chosen.
 
-        - The default implementation is not very efficient; subclasses may wish
-          to override.
+        - This is a thin wrapper around `findTractIdArray`; subclasses should
+          override ``_findTractIdArray`` rather than this method.
 
         **Warning:**
         If tracts do not cover the whole sky then the returned tract may not
         include the coord.
         """
-        distTractInfoList = []
-        for i, tractInfo in enumerate(self):
-            angSep = coord.separation(tractInfo.getCtrCoord()).asDegrees()
-            # include index in order to disambiguate identical angSep values
-            distTractInfoList.append((angSep, i, tractInfo))
-        distTractInfoList.sort()
-        return distTractInfoList[0][2]
+        tractId = self._findTractIdArray(*detail.coordListToArrays([coord]))[0]
+        if tractId < 0:
+            raise LookupError("Unable to find a tract for coord %s" % (coord,))
+        return self[int(tractId)]
+
+    def findTractIdArray(self, ra, dec, degrees=False):
+        """Find the tract for each of an array of coordinates.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`
+            ID of the tract for each coordinate, as would be returned by
+            `findTract`; -1 where no tract can be found.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._findTractIdArray(ra, dec)
+
+    def findTractIdArrayFromVectors(self, vectors):
+        """Find the tract for each of an array of unit vectors.
+
+        Parameters
+        ----------
+        vectors : array-like of `float`, shape (N, 3)
+            ICRS cartesian vectors to search for (length is ignored).
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`
+            ID of the tract for each vector, as would be returned by
+            `findTract`; -1 where no tract can be found.
+        """
+        ra, dec = detail.vectorsToRaDec(vectors)
+        return self._findTractIdArray(ra, dec)
+
+    def findTractPatchArray(self, ra, dec, degrees=False):
+        """Find the tract and patch for each of an array of coordinates.
+
+        This is the array equivalent of calling `findTract` and then
+        `TractInfo.findPatch` for each coordinate.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`
+            ID of the tract for each coordinate; -1 where no tract can be
+            found.
+        patchX, patchY : `numpy.ndarray` of `int`
+            Patch index within the tract; -1 where the coordinate is not
+            in the bounding box of its tract.
+        patchIndex : `numpy.ndarray` of `int`
+            Sequential patch index within the tract, as returned by
+            `TractInfo.getSequentialPatchIndex`; -1 where ``patchX`` is -1.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        tractId = self._findTractIdArray(ra, dec)
+        patchX = numpy.full(len(ra), -1, dtype=numpy.int64)
+        patchY = numpy.full(len(ra), -1, dtype=numpy.int64)
+        patchIndex = numpy.full(len(ra), -1, dtype=numpy.int64)
+        for tid, select in detail.groupIndices(tractId):
+            if tid < 0:
+                continue
+            x, y, index = self[int(tid)]._findPatchArray(ra[select], dec[select])
+            patchX[select] = x
+            patchY[select] = y
+            patchIndex[select] = index
+        return tractId, patchX, patchY, patchIndex
+
+    def findInnerArray(self, ra, dec, tract, patch, degrees=False):
+        """Determine whether each of an array of coordinates is in the inner
+        region of the tract and patch in which it was measured.
+
+        Because tracts and patches overlap, a source may be measured in
+        several (tract, patch) combinations. For sky maps whose tracts cover
+        the whole sky (e.g. `RingsSkyMap`, `HealpixSkyMap`), exactly one of
+        them has the source in the inner region of both the tract and the
+        patch, so requiring both flags deduplicates a merged catalog. For
+        sky maps with gaps between tracts (e.g. `EquatSkyMap` outside its
+        Declination range, or `DiscreteSkyMap`), a source may have no such
+        combination: the tract found for it may not contain it.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination of each measured position.
+        tract : array-like of `int`
+            ID of the tract in which each position was measured.
+        patch : array-like of `int`
+            Sequential index of the patch in which each position was
+            measured, as returned by `TractInfo.getSequentialPatchIndex`.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        isTractInner : `numpy.ndarray` of `bool`
+            Is the position in the inner region of its tract, i.e. is that
+            the tract returned by `findTract`?
+        isPatchInner : `numpy.ndarray` of `bool`
+            Is the position in the inner region of its patch, i.e. is that
+            the patch returned by `TractInfo.findPatch` for its tract?
+            Both flags are False for tract IDs that are not in the sky map.
+
+        Raises
+        ------
+        ValueError
+            If the arrays do not all have the same length.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        tract = numpy.atleast_1d(numpy.asarray(tract, dtype=numpy.int64)).ravel()
+        patch = numpy.atleast_1d(numpy.asarray(patch, dtype=numpy.int64)).ravel()
+        if not len(tract) == len(patch) == len(ra):
+            raise ValueError("ra, tract and patch have different lengths: %d, %d, %d" %
+                             (len(ra), len(tract), len(patch)))
+        isTractInner = (self._findTractIdArray(ra, dec) == tract) & (tract >= 0)
+        isPatchInner = numpy.zeros(len(ra), dtype=bool)
+        for tid, select in detail.groupIndices(tract):
+            if not 0 <= tid < len(self):
+                continue
+            _, _, patchIndex = self[int(tid)]._findPatchArray(ra[select], dec[select])
+            isPatchInner[select] = (patchIndex == patch[select]) & (patchIndex >= 0)
+        return isTractInner, isPatchInner
+
+    def _findTractIdArray(self, ra, dec):
+        """Find the tract for each of an array of coordinates.
+
+        This is the implementation of `findTractIdArray`; subclasses with a
+        faster way of finding tracts should override this method.
+        The default implementation finds the tract whose center is nearest.
+
+        Parameters
+        ----------
+        ra, dec : `numpy.ndarray` of `float`
+            ICRS Right Ascension and Declination (radians), as 1-d arrays.
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`
+            ID of the tract for each coordinate; -1 where no tract can be
+            found.
+        """
+        index = self._getTractCenterIndex()
+        found = index.query(detail.raDecToVectors(ra, dec))
+        tractId = numpy.full(len(ra), -1, dtype=numpy.int64)
+        tractId[found >= 0] = self._tractCenterIds[found[found >= 0]]
+        return tractId
+
+    def _getTractCenterIndex(self):
+        """Return an index of the tract centers, building it if necessary.
+
+        Returns
+        -------
+        index : `lsst.skymap.detail.NearestVectorIndex`
+            Index of the tract center unit vectors, in tract order.
+
+        Notes
+        -----
+        The index is built on first use. It is not part of the pickled
+        state: sky maps are pickled by their configuration, so an unpickled
+        sky map builds a fresh index.
+        """
+        if self._tractCenterIndex is None:
+            tractInfoList = list(self)
+            ctrRa, ctrDec = detail.coordListToArrays(tractInfo.getCtrCoord() for tractInfo in tractInfoList)
+            self._tractCenterIds = numpy.array([tractInfo.getId() for tractInfo in tractInfoList],
+                                               dtype=numpy.int64)
+            self._tractCenterIndex = detail.NearestVectorIndex(detail.raDecToVectors(ctrRa, ctrDec))
+        return self._tractCenterIndex
+
+    def _getTractCapIndex(self):
+        """Return an index of bounding caps of the tracts, building it if
+        necessary.
+
+        Returns
+        -------
+        index : `lsst.skymap.detail.CapIndex`
+            Index of the tract bounding caps, in tract order.
+
+        Notes
+        -----
+        The index is built on first use from the bounding cap of each tract;
+        like the tract center index, it is not part of the pickled state.
+        Subclasses that can compute bounding caps without constructing every
+        tract may override this method.
+        """
+        if self._tractCapIndex is None:
+            caps = [tractInfo._getBoundingCap() for tractInfo in self]
+            self._tractCapIndex = detail.CapIndex([center for center, radius in caps],
+                                                  [radius for center, radius in caps])
+        return self._tractCapIndex
 
     def findTractPatchList(self, coordList):
         """Find tracts and patches that overlap a region.
@@ -166,9 +370,16 @@ class BaseSkyMap:
             This uses a naive algorithm that may find some tracts and patches
             that do not overlap the region (especially if the region is not a
             rectangle aligned along patch x, y).
+
+        Only tracts whose bounding caps intersect that of the region are
+        searched.
         """
+        ra, dec = detail.coordListToArrays(coordList)
+        centers, radii = detail.boundingCaps(detail.raDecToVectors(ra, dec), [0, len(ra)])
+        _, candidates = self._getTractCapIndex().query(centers, radii[0])
         retList = []
-        for tractInfo in self:
+        for tractId in candidates:
+            tractInfo = self[int(tractId)]
             patchList = tractInfo.findPatchList(coordList)
             if patchList:
                 retList.append((tractInfo, patchList))
@@ -188,12 +399,30 @@ class BaseSkyMap:
             list of (TractInfo, list of PatchInfo) for tracts and patches
             that contain, or may contain, the specified region.
             The list will be empty if there is no overlap.
+
+        Notes
+        -----
+        The closest tract to each coord is found, and each of those tracts is
+        listed once, in order of the first coord for which it is closest.
+        Coords that `findTract` cannot place (e.g. outside the Declination
+        range of an `EquatSkyMap`) use the tract whose center is nearest,
+        so a region in the overlap band of a tract still finds its patches.
         """
+        if len(coordList) == 0:
+            return []
+        ra, dec = detail.coordListToArrays(coordList)
+        tractIdArray = self._findTractIdArray(ra, dec)
+        missing = tractIdArray < 0
+        if numpy.any(missing):
+            tractIdArray[missing] = BaseSkyMap._findTractIdArray(self, ra[missing], dec[missing])
+        tractIdArray = tractIdArray[tractIdArray >= 0]
+        # Each tract is searched once, in order of first appearance
+        tractIds, firstIndex = numpy.unique(tractIdArray, return_index=True)
         retList = []
-        for coord in coordList:
-            tractInfo = self.findTract(coord)
+        for tractId in tractIds[numpy.argsort(firstIndex)]:
+            tractInfo = self[int(tractId)]
             patchList = tractInfo.findPatchList(coordList)
-            if patchList and not (tractInfo, patchList) in retList:
+            if patchList:
                 retList.append((tractInfo, patchList))
         return retList
 
@@ -22,7 +22,24 @@
 
 __all__ = ["CachingSkyMap"]
 
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
 from .baseSkyMap import BaseSkyMap
+from . import detail
+
+# Number of tracts above which the default tract cache is sparse
+_SparseCacheThreshold = 1 << 16
+
+# Version of the format of the on-disk tract cache; files of another version
+# are ignored and replaced
+_DiskCacheVersion = 2
 
 
 class CachingSkyMap(BaseSkyMap):
@@ -46,12 +63,26 @@ class CachingSkyMap(BaseSkyMap):
 
     Subclassers should also check that the arguments to the constructor are
     consistent with the below __reduce__ method.
+
+    By default every tract that is generated is cached for the lifetime of
+    the sky map; use `configureTractCache` to bound the number cached, or to
+    iterate over the tracts without caching them. Tracts may also be cached
+    on disk, to be shared between processes and runs; see
+    `configureDiskCache`.
+
+    Tracts may be requested from several threads at once: each tract is
+    generated only once (unless evicted from a bounded cache), so all
+    threads see the same TractInfo.
     """
 
     def __init__(self, numTracts, config=None, version=0):
         super(CachingSkyMap, self).__init__(config)
         self._numTracts = numTracts
-        self._tractCache = [None] * self._numTracts
+        # Locks for tracts being generated, by index; guarded by _tractLocksLock
+        self._tractLocks = {}
+        self._tractLocksLock = threading.Lock()
+        self.configureTractCache()
+        self._diskCacheDir = None
         self._tractInfo = None  # We shouldn't need this; we will generate tracts on demand
         self._version = version
 
@@ -68,10 +99,174 @@ class CachingSkyMap(BaseSkyMap):
         """
         return (self.__class__, (self.config, self._version))
 
+    def configureTractCache(self, maxSize=None, sparse=None, cacheIteration=True):
+        """Configure the cache of generated tracts.
+
+        Any tracts already cached are discarded, and the cache statistics
+        are reset. The cache configuration is not pickled.
+
+        Parameters
+        ----------
+        maxSize : `int`, optional
+            Maximum number of tracts to cache; when the cache is full the
+            least recently used tract is evicted, and will be generated again
+            if it is needed. If None (the default) cache every tract.
+        sparse : `bool`, optional
+            For an unbounded cache, store the tracts in a dict rather than a
+            list with an entry for every tract, so that memory is only used
+            for the tracts generated. If None (the default), use a sparse
+            cache if there are very many tracts.
+        cacheIteration : `bool`, optional
+            Cache the tracts generated when iterating over the sky map? If
+            False, iteration generates each tract that is not already cached
+            without retaining it, so a scan over all tracts runs in constant
+            memory; see also `iterTracts`.
+        """
+        if maxSize is not None:
+            self._tractCache = detail.LruCache(maxSize)
+        elif sparse or (sparse is None and self._numTracts > _SparseCacheThreshold):
+            self._tractCache = detail.DictCache()
+        else:
+            self._tractCache = detail.ListCache(self._numTracts)
+        self._cacheIteration = cacheIteration
+
+    def configureDiskCache(self, directory=None):
+        """Configure the on-disk cache of generated tracts.
+
+        Parameters
+        ----------
+        directory : `str`, optional
+            Directory in which to cache tracts; if None (the default) tracts
+            are not cached on disk.
+
+        Notes
+        -----
+        Each tract is written to ``<directory>/<key>/<index>.pickle`` when it
+        is first generated, where ``<key>`` is a hex digest of `getSha1`, the
+        class and the software version of the sky map. It is read back
+        instead of being generated by any sky map with the same key that uses
+        the same directory, e.g. in later runs or in other
+        processes. Files that are missing, unreadable, or written for another
+        sky map or by an incompatible version of this package are ignored and
+        replaced by a newly generated tract.
+
+        Files are written to a temporary name and renamed into place, so
+        several processes may share a directory. The files are pickles, so
+        only directories with trusted contents should be used. The disk cache
+        configuration is not pickled.
+        """
+        self._diskCacheDir = directory
+
+    def getTractCacheStats(self):
+        """Return statistics of the cache of generated tracts.
+
+        Returns
+        -------
+        stats : `lsst.skymap.detail.CacheStats`
+            Numbers of hits, misses and evictions, and the current and
+            maximum number of cached tracts. The counts are approximate if
+            tracts are requested from several threads at once.
+        """
+        return self._tractCache.getStats()
+
     def __iter__(self):
-        """Iterator over tracts."""
-        for i in range(self._numTracts):
-            yield self[i]
+        """Iterator over tracts.
+
+        Tracts are cached as they are generated unless caching during
+        iteration has been disabled with `configureTractCache`.
+        """
+        return self.iterTracts(cache=self._cacheIteration)
+
+    def iterTracts(self, cache=True, prefetch=0):
+        """Iterate over the tracts.
+
+        Parameters
+        ----------
+        cache : `bool`, optional
+            Cache the tracts that are generated? If False, tracts that are
+            already cached are used, but others are generated without being
+            retained.
+        prefetch : `int`, optional
+            Number of tracts to generate ahead of the one being yielded, in
+            background threads; 0 to generate each tract when it is reached.
+
+        Yields
+        ------
+        tractInfo : `lsst.skymap.TractInfo`
+            Each tract, in order of index.
+        """
+        if prefetch <= 0:
+            for i in range(self._numTracts):
+                yield self._getTract(i, cache)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=prefetch) as executor:
+            futures = collections.deque()
+            nextIndex = 0
+            for i in range(self._numTracts):
+                while nextIndex < self._numTracts and nextIndex <= i + prefetch:
+                    futures.append(executor.submit(self._getTract, nextIndex, cache))
+                    nextIndex += 1
+                yield futures.popleft().result()
+
+    def _getTract(self, index, cache):
+        """Return the tract for an index, optionally without caching it if it
+        has to be generated.
+        """
+        if cache:
+            return self[index]
+        tract = self._tractCache.get(index)
+        return tract if tract is not None else self._loadOrGenerateTract(index)
+
+    def warm(self, indices=None, workers=None, useProcesses=False):
+        """Generate and cache tracts in parallel.
+
+        Parameters
+        ----------
+        indices : iterable of `int`, optional
+            Indices of the tracts to generate; if None, all tracts.
+            Tracts that are already cached are not generated again.
+        workers : `int`, optional
+            Number of threads or processes; if None use the default of
+            `concurrent.futures`.
+        useProcesses : `bool`, optional
+            Generate the tracts in worker processes rather than threads?
+            Processes are not limited by the global interpreter lock; the sky
+            map is sent to each worker once (it pickles as its configuration)
+            and the tracts are pickled back.
+
+        Notes
+        -----
+        The tracts cached are the same as those generated serially. If the
+        tract cache is bounded (see `configureTractCache`), warming more
+        tracts than it holds evicts the earliest ones.
+        """
+        if indices is None:
+            indices = range(self._numTracts)
+        indices = [int(index) for index in indices]
+        for index in indices:
+            if index < 0 or index >= self._numTracts:
+                raise IndexError("Index out of range: %d vs %d" % (index, self._numTracts))
+        indices = [index for index in sorted(set(indices)) if self._tractCache.peek(index) is None]
+        if not indices:
+            return
+        if not useProcesses:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(self.__getitem__, indices):
+                    pass
+            return
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initWarmWorker,
+                                                    initargs=(self, self._diskCacheDir)) as executor:
+            chunkSize = max(1, len(indices)//(4*(workers or 1)))
+            for index, tract in zip(indices, executor.map(_generateTractInWorker, indices,
+                                                          chunksize=chunkSize)):
+                self._cacheTract(index, tract)
+
+    def _cacheTract(self, index, tract):
+        """Cache a tract generated elsewhere, unless one is already cached.
+        """
+        with self._lockTract(index):
+            if self._tractCache.peek(index) is None:
+                self._tractCache.put(index, tract)
 
     def __len__(self):
         """Length is number of tracts."""
@@ -83,14 +278,121 @@ class CachingSkyMap(BaseSkyMap):
         The tract is returned from a cache, if available, otherwise generated
         on the fly.
         """
-        if index < 0 or index > self._numTracts:
+        if index < 0 or index >= self._numTracts:
             raise IndexError("Index out of range: %d vs %d" % (index, self._numTracts))
-        if self._tractCache[index] is not None:
-            return self._tractCache[index]
-        tract = self.generateTract(index)
-        self._tractCache[index] = tract
+        tract = self._tractCache.get(index)
+        if tract is not None:
+            return tract
+        # Only one thread generates each tract; any others wait for it
+        with self._lockTract(index):
+            tract = self._tractCache.peek(index)
+            if tract is None:
+                tract = self._loadOrGenerateTract(index)
+                self._tractCache.put(index, tract)
+        return tract
+
+    def _loadOrGenerateTract(self, index):
+        """Read a tract from the disk cache, if configured, or generate it
+        (and write it to the disk cache).
+        """
+        if self._diskCacheDir is None:
+            return self.generateTract(index)
+        key = self._getDiskCacheKey()
+        path = os.path.join(self._diskCacheDir, key, "%d.pickle" % (index,))
+        tract = _readCachedTract(path, key, index)
+        if tract is None:
+            tract = self.generateTract(index)
+            _writeCachedTract(path, key, index, tract)
         return tract
 
+    def _getDiskCacheKey(self):
+        """Return the key identifying the tracts of this sky map in the disk
+        cache, as a hex digest.
+
+        The SHA1 of a sky map identifies its configuration, but not the
+        software version passed to the constructor, which may change the
+        tracts (e.g. `RingsSkyMap` version 0 retains the DM-14809 numbering),
+        so the class and version are added.
+        """
+        sha1 = hashlib.sha1(self.getSha1())
+        sha1.update(("%s.%s" % (type(self).__module__, type(self).__qualname__)).encode("utf-8"))
+        sha1.update(repr(self._version).encode("utf-8"))
+        return sha1.hexdigest()
+
+    @contextlib.contextmanager
+    def _lockTract(self, index):
+        """Hold the lock for generating or caching the tract for an index.
+        """
+        with self._tractLocksLock:
+            lock = self._tractLocks.setdefault(index, threading.Lock())
+        try:
+            with lock:
+                yield
+        finally:
+            with self._tractLocksLock:
+                if self._tractLocks.get(index) is lock:
+                    del self._tractLocks[index]
+
     def generateTract(self, index):
         """Generate TractInfo for the specified tract index."""
         raise NotImplementedError("Subclasses must define this method.")
+
+
+# Sky map whose tracts are generated by a worker process of CachingSkyMap.warm
+_warmSkyMap = None
+
+
+def _initWarmWorker(skyMap, diskCacheDir):
+    """Initialize a worker process of CachingSkyMap.warm."""
+    global _warmSkyMap
+    _warmSkyMap = skyMap
+    _warmSkyMap.configureDiskCache(diskCacheDir)
+
+
+def _generateTractInWorker(index):
+    """Generate a tract in a worker process of CachingSkyMap.warm."""
+    return _warmSkyMap._loadOrGenerateTract(index)
+
+
+def _readCachedTract(path, key, index):
+    """Read a tract from the disk cache.
+
+    Returns
+    -------
+    tract : `lsst.skymap.TractInfo` or None
+        The tract, or None if the file does not exist, cannot be read, or was
+        not written for this cache key, tract and cache format.
+    """
+    try:
+        with open(path, "rb") as infile:
+            entry = pickle.load(infile)
+        if (entry["version"], entry["key"], entry["index"]) == (_DiskCacheVersion, key, index):
+            return entry["tract"]
+    except Exception:
+        # A missing, truncated or incompatible file is regenerated
+        pass
+    return None
+
+
+def _writeCachedTract(path, key, index, tract):
+    """Write a tract to the disk cache.
+
+    The tract is written to a temporary file that is renamed into place, so
+    readers never see a partial file, and concurrent writers of the same
+    tract are harmless. Failures to write are ignored: the cache is only an
+    optimization.
+    """
+    entry = dict(version=_DiskCacheVersion, key=key, index=index, tract=tract)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tempPath = tempfile.mkstemp(dir=directory, prefix=".%d." % (index,), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as outfile:
+                pickle.dump(entry, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tempPath, path)
+        except BaseException:
+            os.unlink(tempPath)
+            raise
+    except OSError:
+        pass
@@ -0,0 +1,485 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+"""Partition catalog files into one output per (tract, patch).
+
+The catalogs are streamed in chunks of rows, so arbitrarily large inputs
+can be sharded with bounded memory; see `shardCatalog`, or run
+``shardCatalog.py --help`` for the command-line interface.
+"""
+
+__all__ = ["shardCatalog", "main"]
+
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import pickle
+
+import numpy
+
+# Parquet and FITS support are optional; we only complain if they are used
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+try:
+    from astropy.io import fits
+except ImportError:
+    fits = None
+
+from . import detail
+from .skyMapRegistry import skyMapRegistry
+from .tractPatchAssigner import ParallelTractPatchAssigner
+
+# Input formats, by file name extension
+_InputFormats = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".fits": "fits",
+    ".fit": "fits",
+    ".fits.gz": "fits",
+}
+
+_ManifestName = "manifest.json"
+
+
+def shardCatalog(inputPaths, outputDir, skyMap, raColumn="ra", decColumn="dec", degrees=True,
+                 inputFormat=None, outputFormat="csv", chunkSize=1 << 20, maxOpenFiles=64,
+                 memoryBudget=1 << 28, numWorkers=1):
+    """Partition catalog files into one output per (tract, patch).
+
+    Parameters
+    ----------
+    inputPaths : iterable of `str`
+        Catalog files to read (CSV with a header row, Parquet or FITS
+        binary tables), all with the same columns.
+    outputDir : `str`
+        Directory in which to write the outputs and the manifest; it is
+        created if necessary, and must be empty.
+    skyMap : `lsst.skymap.BaseSkyMap`
+        Sky map defining the tracts and patches.
+    raColumn, decColumn : `str`, optional
+        Names of the ICRS Right Ascension and Declination columns.
+    degrees : `bool`, optional
+        Are the coordinates in degrees (otherwise radians)?
+    inputFormat : `str`, optional
+        Format of all the inputs: "csv", "parquet" or "fits"; if None it is
+        determined from the extension of each file name.
+    outputFormat : `str`, optional
+        Format of the outputs: "csv" writes ``<tract>/<patch>.csv``;
+        "parquet" writes ``<tract>/<patch>/part-<n>.parquet``.
+    chunkSize : `int`, optional
+        Number of rows read and assigned at once.
+    maxOpenFiles : `int`, optional
+        Maximum number of output files open at once; the least recently
+        used file is closed to open another.
+    memoryBudget : `int`, optional
+        Approximate maximum number of bytes of rows buffered for output;
+        when it is exceeded, the largest buffers are written out.
+    numWorkers : `int`, optional
+        Number of processes used to assign tracts and patches; see
+        `lsst.skymap.ParallelTractPatchAssigner`.
+
+    Returns
+    -------
+    manifest : `dict`
+        The contents of the manifest, which is also written to
+        ``manifest.json`` in ``outputDir``: the inputs, the number of rows
+        read and the number that could not be assigned a patch (which are
+        not written), and for each patch the tract, patch indices, number of
+        rows and output path (relative to ``outputDir``).
+
+    Raises
+    ------
+    ValueError
+        If a format is not recognized, or the inputs lack a required column
+        or have different columns.
+    RuntimeError
+        If the library needed to read or write a format is not available.
+    FileExistsError
+        If ``outputDir`` is not empty; outputs of an earlier run would not
+        match the manifest.
+    """
+    inputPaths = list(inputPaths)
+    if outputFormat not in _PatchWriters:
+        raise ValueError("Unrecognized output format %r; must be one of %s" %
+                         (outputFormat, sorted(_PatchWriters)))
+    os.makedirs(outputDir, exist_ok=True)
+    if os.listdir(outputDir):
+        raise FileExistsError("Output directory %s is not empty" % (outputDir,))
+    writer = _PatchWriters[outputFormat](outputDir, maxOpenFiles)
+    buffers = _PatchBuffers(writer, memoryBudget)
+    rowCounts = collections.Counter()
+    patchIndices = {}
+    columnNames = None
+    numRows = 0
+    numUnassigned = 0
+    # Split each chunk between the workers
+    assignerChunkSize = max(1, -(-chunkSize//max(1, numWorkers)))
+    try:
+        with ParallelTractPatchAssigner(skyMap, chunkSize=assignerChunkSize,
+                                        numWorkers=numWorkers) as assigner:
+            for path in inputPaths:
+                for columns in _readCatalog(path, inputFormat, chunkSize):
+                    if columnNames is None:
+                        columnNames = list(columns)
+                        for name in (raColumn, decColumn):
+                            if name not in columns:
+                                raise ValueError("Column %r not found in %s" % (name, path))
+                    elif list(columns) != columnNames:
+                        raise ValueError("Columns of %s do not match those of %s" % (path, inputPaths[0]))
+                    assignment = assigner.assign(columns[raColumn].astype(float),
+                                                 columns[decColumn].astype(float), degrees=degrees)
+                    numRows += len(assignment)
+                    assigned = numpy.flatnonzero(assignment["patch"] >= 0)
+                    numUnassigned += len(assignment) - len(assigned)
+                    keys = (assignment["tract"][assigned] << 32) | assignment["patch"][assigned]
+                    for key, select in detail.groupIndices(keys):
+                        rows = assigned[select]
+                        key = (int(assignment["tract"][rows[0]]), int(assignment["patch"][rows[0]]))
+                        patchIndices[key] = (int(assignment["patch_x"][rows[0]]),
+                                             int(assignment["patch_y"][rows[0]]))
+                        rowCounts[key] += len(rows)
+                        buffers.add(key, {name: column[rows] for name, column in columns.items()})
+            buffers.flush()
+    finally:
+        writer.close()
+
+    manifest = {
+        "skyMap": {"class": type(skyMap).__name__, "sha1": skyMap.getSha1().hex()},
+        "inputs": inputPaths,
+        "format": outputFormat,
+        "numRows": numRows,
+        "numUnassigned": numUnassigned,
+        "patches": [{"tract": tract, "patch": patch, "patch_x": patchIndices[tract, patch][0],
+                     "patch_y": patchIndices[tract, patch][1], "rows": rowCounts[tract, patch],
+                     "path": writer.getRelativePath(tract, patch)}
+                    for tract, patch in sorted(rowCounts)],
+    }
+    with open(os.path.join(outputDir, _ManifestName), "w") as stream:
+        json.dump(manifest, stream, indent=2)
+    return manifest
+
+
+def _readCatalog(path, inputFormat, chunkSize):
+    """Read a catalog in chunks of rows.
+
+    Parameters
+    ----------
+    path : `str`
+        Catalog file name.
+    inputFormat : `str` or None
+        Format of the file; if None it is determined from the extension.
+    chunkSize : `int`
+        Maximum number of rows in each chunk.
+
+    Yields
+    ------
+    columns : `dict` [`str`, `numpy.ndarray`]
+        Columns of a chunk of rows, in file order.
+    """
+    if inputFormat is None:
+        extension = next((ext for ext in sorted(_InputFormats, key=len, reverse=True)
+                          if path.lower().endswith(ext)), None)
+        if extension is None:
+            raise ValueError("Cannot determine the format of %s from its extension" % (path,))
+        inputFormat = _InputFormats[extension]
+    if inputFormat == "csv":
+        return _readCsv(path, chunkSize)
+    if inputFormat == "parquet":
+        return _readParquet(path, chunkSize)
+    if inputFormat == "fits":
+        return _readFits(path, chunkSize)
+    raise ValueError("Unrecognized input format %r; must be one of csv, parquet, fits" % (inputFormat,))
+
+
+def _readCsv(path, chunkSize):
+    """Read a CSV file with a header row in chunks; values are strings."""
+    with open(path, newline="") as stream:
+        reader = csv.reader(stream)
+        names = next(reader, None)
+        if names is None:
+            return
+        while True:
+            rows = list(itertools.islice(reader, chunkSize))
+            if not rows:
+                return
+            if any(len(row) != len(names) for row in rows):
+                raise ValueError("Rows of %s do not all have %d values" % (path, len(names)))
+            values = numpy.array(rows, dtype=str)
+            yield {name: values[:, i] for i, name in enumerate(names)}
+
+
+def _readParquet(path, chunkSize):
+    """Read a Parquet file in chunks."""
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is required to read Parquet file %s" % (path,))
+    parquetFile = pyarrow.parquet.ParquetFile(path)
+    for batch in parquetFile.iter_batches(batch_size=chunkSize):
+        yield {name: batch.column(i).to_numpy(zero_copy_only=False)
+               for i, name in enumerate(batch.schema.names)}
+
+
+def _readFits(path, chunkSize):
+    """Read the first binary table of a FITS file in chunks."""
+    if fits is None:
+        raise RuntimeError("astropy is required to read FITS file %s" % (path,))
+    with fits.open(path, memmap=True) as hduList:
+        hdu = next((hdu for hdu in hduList if isinstance(hdu, fits.BinTableHDU)), None)
+        if hdu is None:
+            raise ValueError("No binary table found in %s" % (path,))
+        data = hdu.data
+        for start in range(0, len(data), chunkSize):
+            rows = data[start:start + chunkSize]
+            yield {name: _nativeColumn(numpy.array(rows[name])) for name in data.columns.names}
+
+
+def _nativeColumn(column):
+    """Convert a column read from a FITS file to native byte order, and
+    decode byte strings, so it can be written like columns of other formats.
+    """
+    if column.dtype.kind == "S":
+        return numpy.char.decode(column, "ascii")
+    if not column.dtype.isnative:
+        return column.astype(column.dtype.newbyteorder("="))
+    return column
+
+
+class _PatchBuffers:
+    """Rows waiting to be written, by patch.
+
+    Parameters
+    ----------
+    writer : `_PatchWriter`
+        Writer for the rows.
+    memoryBudget : `int`
+        Approximate maximum number of bytes to buffer.
+    """
+
+    def __init__(self, writer, memoryBudget):
+        self._writer = writer
+        self._memoryBudget = memoryBudget
+        self._buffers = collections.defaultdict(list)
+        self._sizes = collections.Counter()
+        self._totalSize = 0
+
+    def add(self, key, columns):
+        """Buffer rows for a patch, writing out the largest buffers if the
+        memory budget is exceeded.
+
+        Parameters
+        ----------
+        key : `tuple` of `int`
+            Tract ID and sequential patch index.
+        columns : `dict` [`str`, `numpy.ndarray`]
+            Columns of the rows.
+        """
+        size = sum(column.nbytes for column in columns.values())
+        self._buffers[key].append(columns)
+        self._sizes[key] += size
+        self._totalSize += size
+        while self._totalSize > self._memoryBudget and self._sizes:
+            self._flushKey(self._sizes.most_common(1)[0][0])
+
+    def flush(self):
+        """Write all the buffered rows."""
+        for key in list(self._buffers):
+            self._flushKey(key)
+
+    def _flushKey(self, key):
+        chunks = self._buffers.pop(key)
+        self._totalSize -= self._sizes.pop(key)
+        names = list(chunks[0])
+        self._writer.write(key[0], key[1], {name: numpy.concatenate([chunk[name] for chunk in chunks])
+                                            for name in names})
+
+
+class _PatchWriter:
+    """Base class for writing rows to one output per patch, keeping a
+    bounded number of files open.
+
+    Parameters
+    ----------
+    outputDir : `str`
+        Root directory of the outputs.
+    maxOpenFiles : `int`
+        Maximum number of files open at once.
+
+    Notes
+    -----
+    Subclasses must implement ``getRelativePath``, ``_open``, ``_append``
+    and ``_closeHandle``.
+    """
+
+    def __init__(self, outputDir, maxOpenFiles):
+        if maxOpenFiles < 1:
+            raise ValueError("maxOpenFiles=%s; must be positive" % (maxOpenFiles,))
+        self._outputDir = outputDir
+        self._maxOpenFiles = maxOpenFiles
+        # Open handles by (tract, patch), least recently used first
+        self._handles = collections.OrderedDict()
+        # Number of times the output for each (tract, patch) has been opened
+        self._numOpens = collections.Counter()
+
+    def write(self, tract, patch, columns):
+        """Write rows to the output for a patch.
+
+        Parameters
+        ----------
+        tract : `int`
+            Tract ID.
+        patch : `int`
+            Sequential patch index.
+        columns : `dict` [`str`, `numpy.ndarray`]
+            Columns of the rows.
+        """
+        key = (tract, patch)
+        handle = self._handles.pop(key, None)
+        if handle is None:
+            while len(self._handles) >= self._maxOpenFiles:
+                self._closeHandle(self._handles.popitem(last=False)[1])
+            path = os.path.join(self._outputDir, self.getRelativePath(tract, patch))
+            handle = self._open(path, columns, self._numOpens[key])
+            self._numOpens[key] += 1
+        self._handles[key] = handle
+        self._append(handle, columns)
+
+    def close(self):
+        """Close all open files."""
+        while self._handles:
+            self._closeHandle(self._handles.popitem(last=False)[1])
+
+
+class _CsvPatchWriter(_PatchWriter):
+    """Write rows to ``<tract>/<patch>.csv``, with a header row."""
+
+    def getRelativePath(self, tract, patch):
+        return os.path.join(str(tract), "%d.csv" % (patch,))
+
+    def _open(self, path, columns, numOpens):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if numOpens > 0:
+            stream = open(path, "a", newline="")
+            return stream, csv.writer(stream)
+        stream = open(path, "w", newline="")
+        writer = csv.writer(stream)
+        writer.writerow(list(columns))
+        return stream, writer
+
+    def _append(self, handle, columns):
+        handle[1].writerows(zip(*(column.tolist() for column in columns.values())))
+
+    def _closeHandle(self, handle):
+        handle[0].close()
+
+
+class _ParquetPatchWriter(_PatchWriter):
+    """Write rows to ``<tract>/<patch>/part-<n>.parquet``.
+
+    Parquet files cannot be appended to once closed, so a new part is
+    started each time the output for a patch is reopened.
+    """
+
+    def __init__(self, outputDir, maxOpenFiles):
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required to write Parquet files")
+        super().__init__(outputDir, maxOpenFiles)
+
+    def getRelativePath(self, tract, patch):
+        return os.path.join(str(tract), str(patch))
+
+    def _open(self, path, columns, numOpens):
+        os.makedirs(path, exist_ok=True)
+        table = pyarrow.table(columns)
+        return pyarrow.parquet.ParquetWriter(os.path.join(path, "part-%05d.parquet" % (numOpens,)),
+                                             table.schema)
+
+    def _append(self, handle, columns):
+        handle.write_table(pyarrow.table(columns))
+
+    def _closeHandle(self, handle):
+        handle.close()
+
+
+_PatchWriters = {
+    "csv": _CsvPatchWriter,
+    "parquet": _ParquetPatchWriter,
+}
+
+
+def main(argv=None):
+    """Command-line entry point for `shardCatalog`.
+
+    Parameters
+    ----------
+    argv : `list` of `str`, optional
+        Command-line arguments; if None use `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(
+        description="Partition catalog files into one output per (tract, patch), "
+                    "and write a manifest of the number of rows in each.")
+    parser.add_argument("outputDir", help="directory for the outputs and manifest")
+    parser.add_argument("inputs", nargs="+", help="catalog files (CSV, Parquet or FITS)")
+    skyMapGroup = parser.add_mutually_exclusive_group(required=True)
+    skyMapGroup.add_argument("--skymap", choices=sorted(skyMapRegistry),
+                             help="name of the sky map class in the sky map registry")
+    skyMapGroup.add_argument("--skymap-pickle", help="pickled sky map, e.g. as written by the butler")
+    parser.add_argument("--config", help="sky map config override file, for --skymap")
+    parser.add_argument("--ra-column", default="ra", help="name of the Right Ascension column")
+    parser.add_argument("--dec-column", default="dec", help="name of the Declination column")
+    parser.add_argument("--radians", action="store_true", help="coordinates are in radians, not degrees")
+    parser.add_argument("--input-format", choices=["csv", "parquet", "fits"],
+                        help="format of the inputs (default: from the file name extension)")
+    parser.add_argument("--output-format", choices=sorted(_PatchWriters), default="csv",
+                        help="format of the outputs")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="rows read at once")
+    parser.add_argument("--max-open-files", type=int, default=64, help="output files open at once")
+    parser.add_argument("--memory-budget", type=float, default=256,
+                        help="approximate memory for buffered rows (MiB)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="processes used to assign tracts and patches")
+    args = parser.parse_args(argv)
+
+    if args.skymap_pickle is not None:
+        if args.config is not None:
+            parser.error("--config can only be used with --skymap")
+        with open(args.skymap_pickle, "rb") as stream:
+            skyMap = pickle.load(stream)
+    else:
+        SkyMapClass = skyMapRegistry[args.skymap]
+        config = SkyMapClass.ConfigClass()
+        if args.config is not None:
+            config.load(args.config)
+        skyMap = SkyMapClass(config=config)
+
+    manifest = shardCatalog(args.inputs, args.outputDir, skyMap, raColumn=args.ra_column,
+                            decColumn=args.dec_column, degrees=not args.radians,
+                            inputFormat=args.input_format, outputFormat=args.output_format,
+                            chunkSize=args.chunk_size, maxOpenFiles=args.max_open_files,
+                            memoryBudget=int(args.memory_budget*(1 << 20)), numWorkers=args.workers)
+    print("Wrote %d of %d rows to %d patches in %s" %
+          (manifest["numRows"] - manifest["numUnassigned"], manifest["numRows"],
+           len(manifest["patches"]), args.outputDir))
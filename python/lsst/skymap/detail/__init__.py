@@ -1,3 +1,5 @@
 from .dodecahedron import *
 from .wcsFactory import *
 from .utils import *
+from .spatialIndex import *
+from .cache import *
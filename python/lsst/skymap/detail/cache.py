@@ -0,0 +1,214 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+
+__all__ = ["CacheStats", "ListCache", "DictCache", "LruCache"]
+
+import collections
+import threading
+
+
+CacheStats = collections.namedtuple("CacheStats", ["hits", "misses", "evictions", "size", "maxSize"])
+CacheStats.__doc__ = """Statistics of a cache.
+
+Parameters
+----------
+hits : `int`
+    Number of lookups that found an entry.
+misses : `int`
+    Number of lookups that did not find an entry.
+evictions : `int`
+    Number of entries removed to make room for others.
+size : `int`
+    Number of entries in the cache.
+maxSize : `int` or None
+    Maximum number of entries, or None if unbounded.
+"""
+
+
+class ListCache:
+    """An unbounded cache of objects with integer keys in ``[0, size)``,
+    stored in a list.
+
+    Parameters
+    ----------
+    size : `int`
+        Number of possible keys.
+    """
+
+    maxSize = None
+
+    def __init__(self, size):
+        self._entries = [None]*size
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Return the cached object for a key, or None if it is not cached.
+        """
+        value = self._entries[key]
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    def peek(self, key):
+        """Return the cached object for a key, or None if it is not cached,
+        without updating the statistics.
+        """
+        return self._entries[key]
+
+    def put(self, key, value):
+        """Cache an object for a key."""
+        if self._entries[key] is None:
+            self._size += 1
+        self._entries[key] = value
+
+    def clear(self):
+        """Remove all cached objects; the statistics are kept."""
+        self._entries = [None]*len(self._entries)
+        self._size = 0
+
+    def getStats(self):
+        """Return the statistics of the cache (`CacheStats`)."""
+        return CacheStats(hits=self._hits, misses=self._misses, evictions=0, size=self._size,
+                          maxSize=self.maxSize)
+
+    def __len__(self):
+        return self._size
+
+
+class DictCache:
+    """An unbounded cache of objects, stored in a dict.
+
+    Unlike `ListCache`, no memory is used for keys that are not cached,
+    which suits a large number of possible keys of which few are used.
+    """
+
+    maxSize = None
+
+    def __init__(self):
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """Return the cached object for a key, or None if it is not cached.
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    def peek(self, key):
+        """Return the cached object for a key, or None if it is not cached,
+        without updating the statistics.
+        """
+        return self._entries.get(key)
+
+    def put(self, key, value):
+        """Cache an object for a key."""
+        self._entries[key] = value
+
+    def clear(self):
+        """Remove all cached objects; the statistics are kept."""
+        self._entries.clear()
+
+    def getStats(self):
+        """Return the statistics of the cache (`CacheStats`)."""
+        return CacheStats(hits=self._hits, misses=self._misses, evictions=0, size=len(self._entries),
+                          maxSize=self.maxSize)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LruCache:
+    """A cache of a bounded number of objects, evicting the least recently
+    used object to make room for another.
+
+    Parameters
+    ----------
+    maxSize : `int`
+        Maximum number of objects to cache.
+
+    Notes
+    -----
+    Unlike the unbounded caches, every lookup reorders the entries, so
+    lookups and updates are serialized by a lock.
+    """
+
+    def __init__(self, maxSize):
+        if maxSize < 1:
+            raise ValueError("maxSize=%s; must be positive" % (maxSize,))
+        self.maxSize = int(maxSize)
+        # Least recently used first
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached object for a key, or None if it is not cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def peek(self, key):
+        """Return the cached object for a key, or None if it is not cached,
+        without updating the statistics or the order of use.
+        """
+        return self._entries.get(key)
+
+    def put(self, key, value):
+        """Cache an object for a key, evicting the least recently used
+        object if the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Remove all cached objects; the statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def getStats(self):
+        """Return the statistics of the cache (`CacheStats`)."""
+        return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions,
+                          size=len(self._entries), maxSize=self.maxSize)
+
+    def __len__(self):
+        return len(self._entries)
@@ -41,6 +41,7 @@ class Dodecahedron:
         self.vertexVecList = [numpy.dot(rotMat, unrotVertexVec) for unrotVertexVec in unrotVertexVecList]
         unsortedFaceList = [numpy.dot(rotMat, unrotFaceVec) for unrotFaceVec in unrotFaceVecList]
         self.faceVecList = _sortedVectorList(unsortedFaceList)
+        self._faceVecArray = numpy.array(self.faceVecList)
 
     def getFaceCtrList(self):
         """Return a list of face centers.
@@ -107,6 +108,22 @@ class Dodecahedron:
         """
         return numpy.argmax(numpy.dot(self.faceVecList, vec))
 
+    def getFaceIndArray(self, vecArray):
+        """Return the index of the face containing each of an array of
+        cartesian vectors.
+
+        Parameters
+        ----------
+        vecArray : `numpy.ndarray`, shape (N, 3)
+            Cartesian vectors (length is ignored).
+
+        Returns
+        -------
+        results : `numpy.ndarray` of `int`
+            Index of face containing each vector.
+        """
+        return numpy.argmax(numpy.dot(vecArray, self._faceVecArray.T), axis=1)
+
     def getWithFacesOnPoles(self):
         return self._withFacesOnPoles
 
@@ -0,0 +1,432 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+
+__all__ = ["NearestVectorIndex", "CapIndex", "boundingCaps"]
+
+import numpy
+
+from .utils import vectorsToRaDec
+
+
+class NearestVectorIndex:
+    """An index for finding the nearest of a fixed set of unit vectors.
+
+    Parameters
+    ----------
+    vectors : array-like of `float`, shape (M, 3)
+        Unit vectors to search, e.g. the centers of tracts.
+    chunkSize : `int`, optional
+        Maximum number of elements in the (query x vector) dot-product matrix
+        evaluated at once; bounds the memory used by `query`.
+
+    Notes
+    -----
+    Queries are answered by a dot-product matrix search: the nearest vector
+    is the one with the largest dot product with the query vector. Queries
+    are processed in chunks so that memory use is bounded for large inputs.
+    """
+
+    def __init__(self, vectors, chunkSize=1 << 24):
+        self._vectors = numpy.ascontiguousarray(numpy.asarray(vectors, dtype=float).reshape(-1, 3))
+        self._chunkSize = int(chunkSize)
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def query(self, vectors):
+        """Find the nearest vector in the index for each query vector.
+
+        Parameters
+        ----------
+        vectors : array-like of `float`, shape (N, 3)
+            Query unit vectors.
+
+        Returns
+        -------
+        index : `numpy.ndarray` of `int`
+            Index of the nearest vector in the index for each query vector.
+            If several are equidistant, the lowest index is returned.
+            -1 where the query vector is not finite or the index is empty.
+        """
+        vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+        result = numpy.full(len(vectors), -1, dtype=numpy.int64)
+        if len(self._vectors) == 0:
+            return result
+        good = numpy.flatnonzero(numpy.all(numpy.isfinite(vectors), axis=1))
+        step = max(1, self._chunkSize // len(self._vectors))
+        for start in range(0, len(good), step):
+            rows = good[start:start + step]
+            # argmax returns the first maximum, giving lowest-index tie-breaking
+            result[rows] = numpy.argmax(vectors[rows] @ self._vectors.T, axis=1)
+        return result
+
+
+class CapIndex:
+    """An index of spherical caps, for finding the caps that contain points
+    and the cap whose center is nearest a point.
+
+    Parameters
+    ----------
+    vectors : array-like of `float`, shape (M, 3)
+        Unit vectors of the cap centers.
+    radii : array-like of `float`, shape (M,)
+        Angular radius of each cap (radians).
+    chunkSize : `int`, optional
+        Maximum number of query points processed at once.
+    maxPairs : `int`, optional
+        Maximum number of candidate (point, cap) pairs evaluated at once;
+        with ``chunkSize``, bounds the memory used by `query` and
+        `queryNearest`.
+
+    Notes
+    -----
+    The caps are grouped into buckets of similar radius (within a factor of
+    two), so that a few large caps do not widen the search for the others.
+    Within each bucket, the cap centers are divided into Declination zones
+    whose height is the largest radius in the bucket, and sorted by Right
+    Ascension within each zone. A point can only be within angle ``r`` of a
+    center whose Declination is within ``r`` of its own, and whose Right
+    Ascension is within ``asin(sin(r)/cos(dec))``, so each query examines
+    only the centers in a few Right Ascension ranges found by bisection,
+    rather than every cap.
+    """
+
+    def __init__(self, vectors, radii, chunkSize=1 << 16, maxPairs=1 << 22):
+        vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+        radii = numpy.asarray(radii, dtype=float).reshape(-1)
+        if len(radii) != len(vectors):
+            raise ValueError("Number of radii (%d) and vectors (%d) do not match" %
+                             (len(radii), len(vectors)))
+        ra, dec = vectorsToRaDec(vectors)
+        bucket = numpy.floor(numpy.log2(numpy.maximum(radii, _MinZoneHeight))).astype(numpy.int64)
+        bucketRadius = numpy.zeros(len(radii))
+        zoneHeight = numpy.zeros(len(radii))
+        for value in numpy.unique(bucket):
+            members = bucket == value
+            bucketRadius[members] = radii[members].max()
+            zoneHeight[members] = max(radii[members].max(), _MinZoneHeight)
+        with numpy.errstate(invalid="ignore"):
+            zone = numpy.floor((dec + 0.5*numpy.pi)/zoneHeight)
+        zone = numpy.clip(numpy.nan_to_num(zone), 0, numpy.ceil(numpy.pi/zoneHeight) - 1).astype(numpy.int64)
+
+        self._order = numpy.lexsort((ra, zone, bucket))
+        self._vectors = numpy.ascontiguousarray(vectors[self._order])
+        self._ra = ra[self._order]
+        self._radii = radii[self._order]
+        self._cosRadii = numpy.cos(self._radii)
+        bucket = bucket[self._order]
+        zone = zone[self._order]
+
+        # For each bucket: radius, zone height, and the zone number, start
+        # and end (in sorted order) of each non-empty zone
+        self._buckets = []
+        bucketStarts, bucketEnds = _runs(bucket)
+        for bucketStart, bucketEnd in zip(bucketStarts, bucketEnds):
+            zoneStarts, zoneEnds = _runs(zone[bucketStart:bucketEnd])
+            self._buckets.append((float(bucketRadius[self._order[bucketStart]]),
+                                  float(zoneHeight[self._order[bucketStart]]),
+                                  zone[bucketStart + zoneStarts], zoneStarts + bucketStart,
+                                  zoneEnds + bucketStart))
+        self._chunkSize = int(chunkSize)
+        self._maxPairs = int(maxPairs)
+        self._nearestIndex = NearestVectorIndex(vectors)
+
+    def __len__(self):
+        return len(self._order)
+
+    def query(self, vectors, radius=0.0):
+        """Find all caps that contain each point, or that come within a
+        given angle of it.
+
+        Parameters
+        ----------
+        vectors : array-like of `float`, shape (N, 3)
+            Query unit vectors.
+        radius : `float`, optional
+            Angular radius (radians) around each query point; caps that
+            intersect this disk are returned. Zero finds the caps that
+            contain the points.
+
+        Returns
+        -------
+        pointIndex : `numpy.ndarray` of `int`
+            Index of the query point for each (point, cap) match, in
+            increasing order.
+        capIndex : `numpy.ndarray` of `int`
+            Index of the cap for each match; increasing for each point.
+        """
+        vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+        pointList = []
+        capList = []
+        for start in range(0, len(vectors), self._chunkSize):
+            chunkPoints = []
+            chunkCaps = []
+            for pointIndex, capSorted, dot in self._candidatePairs(vectors[start:start + self._chunkSize],
+                                                                   radius, True):
+                if radius > 0:
+                    cosRadii = numpy.cos(numpy.minimum(self._radii[capSorted] + radius, numpy.pi))
+                else:
+                    cosRadii = self._cosRadii[capSorted]
+                inside = dot >= cosRadii
+                chunkPoints.append(pointIndex[inside] + start)
+                chunkCaps.append(self._order[capSorted[inside]])
+            if not chunkPoints:
+                continue
+            pointIndex = numpy.concatenate(chunkPoints)
+            capIndex = numpy.concatenate(chunkCaps)
+            order = numpy.lexsort((capIndex, pointIndex))
+            pointList.append(pointIndex[order])
+            capList.append(capIndex[order])
+        if not pointList:
+            return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+        return numpy.concatenate(pointList), numpy.concatenate(capList)
+
+    def queryNearest(self, vectors):
+        """Find the cap whose center is nearest each point.
+
+        Parameters
+        ----------
+        vectors : array-like of `float`, shape (N, 3)
+            Query unit vectors.
+
+        Returns
+        -------
+        capIndex : `numpy.ndarray` of `int`
+            Index of the nearest cap center; if several are equidistant, the
+            lowest index is returned. -1 where the query vector is not finite
+            or the index is empty.
+
+        Notes
+        -----
+        The nearest center within a search radius is exact if it is closer
+        than the search radius. The centers within the median cap radius
+        are searched first, then those within the largest cap radius; any
+        points left fall back to a search over all centers.
+        """
+        vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+        result = numpy.full(len(vectors), -1, dtype=numpy.int64)
+        if len(self) == 0:
+            return result
+        remaining = numpy.flatnonzero(numpy.all(numpy.isfinite(vectors), axis=1))
+        for width in numpy.unique([numpy.median(self._radii), self._radii.max()]):
+            if len(remaining) == 0 or not 0 < width < numpy.pi:
+                continue
+            found = numpy.concatenate([self._nearestWithin(vectors[remaining[start:start + self._chunkSize]],
+                                                           width)
+                                       for start in range(0, len(remaining), self._chunkSize)])
+            result[remaining] = found
+            remaining = remaining[found < 0]
+        if len(remaining) > 0:
+            result[remaining] = self._nearestIndex.query(vectors[remaining])
+        return result
+
+    def _nearestWithin(self, vectors, width):
+        """Find the nearest cap center to each point, if it is provably the
+        nearest because it is within ``width`` (radians) of the point.
+
+        Returns
+        -------
+        capIndex : `numpy.ndarray` of `int`
+            Index of the nearest cap center, or -1 if it is not proven.
+        """
+        bestDot = numpy.full(len(vectors), -numpy.inf)
+        bestCap = numpy.full(len(vectors), -1, dtype=numpy.int64)
+        for pointIndex, capSorted, dot in self._candidatePairs(vectors, width, False):
+            capIndex = self._order[capSorted]
+            # best match for each point: largest dot product, then lowest index
+            order = numpy.lexsort((capIndex, -dot, pointIndex))
+            first = numpy.ones(len(order), dtype=bool)
+            first[1:] = pointIndex[order][1:] != pointIndex[order][:-1]
+            best = order[first]
+            points = pointIndex[best]
+            better = ((dot[best] > bestDot[points]) |
+                      ((dot[best] == bestDot[points]) & (capIndex[best] < bestCap[points])))
+            bestDot[points[better]] = dot[best][better]
+            bestCap[points[better]] = capIndex[best][better]
+        with numpy.errstate(invalid="ignore"):
+            proven = numpy.arccos(numpy.clip(bestDot, -1.0, 1.0)) < width*(1.0 - 1e-9)
+        return numpy.where(proven, bestCap, -1)
+
+    def _candidatePairs(self, vectors, radius, addCapRadii):
+        """Generate the candidate (point, cap) pairs: the caps whose centers
+        may be close enough to each point.
+
+        Parameters
+        ----------
+        vectors : `numpy.ndarray` of `float`, shape (N, 3)
+            Query unit vectors.
+        radius : `float`
+            Angular distance (radians) of the centers to find.
+        addCapRadii : `bool`
+            Add the cap radius to ``radius`` for each cap?
+
+        Yields
+        ------
+        pointIndex : `numpy.ndarray` of `int`
+            Index of the query point for each candidate pair.
+        capSorted : `numpy.ndarray` of `int`
+            Index of the cap (in sorted order) for each candidate pair.
+        dot : `numpy.ndarray` of `float`
+            Dot product of the point and cap center for each candidate pair.
+
+        Notes
+        -----
+        Candidate pairs are generated in batches of at most ``maxPairs``
+        pairs (unless a single point has more candidates).
+        """
+        ra, dec = vectorsToRaDec(vectors)
+        good = numpy.flatnonzero(numpy.isfinite(ra) & numpy.isfinite(dec))
+        decOrder = good[numpy.argsort(dec[good], kind="stable")]
+        sortedDec = dec[decOrder]
+        # Candidates are the ranges [lo, hi) of sorted caps for each point
+        pointList = []
+        loList = []
+        hiList = []
+        for bucketRadius, zoneHeight, zones, zoneStarts, zoneEnds in self._buckets:
+            width = radius + bucketRadius if addCapRadii else radius
+            # Allow for rounding
+            width = width*(1.0 + 1e-9) + 1e-12
+            if width >= numpy.pi:
+                pointList.append(good)
+                loList.append(numpy.full(len(good), zoneStarts[0]))
+                hiList.append(numpy.full(len(good), zoneEnds[-1]))
+                continue
+            sinWidth = numpy.sin(width)
+            for zone, zoneStart, zoneEnd in zip(zones, zoneStarts, zoneEnds):
+                zoneMin = zone*zoneHeight - 0.5*numpy.pi
+                points = decOrder[numpy.searchsorted(sortedDec, zoneMin - width, side="left"):
+                                  numpy.searchsorted(sortedDec, zoneMin + zoneHeight + width, side="right")]
+                if len(points) == 0:
+                    continue
+                pointDec = dec[points]
+                whole = numpy.abs(pointDec) + width >= 0.5*numpy.pi
+                with numpy.errstate(divide="ignore", invalid="ignore"):
+                    halfWidth = numpy.arcsin(numpy.clip(sinWidth/numpy.cos(pointDec), 0.0, 1.0))
+                # Points near a pole may match any Right Ascension
+                lower = numpy.where(whole, -numpy.inf, ra[points] - halfWidth)
+                upper = numpy.where(whole, numpy.inf, ra[points] + halfWidth)
+                wrapLower = ~whole & (lower < 0)
+                wrapUpper = ~whole & (upper > 2*numpy.pi)
+                zoneRa = self._ra[zoneStart:zoneEnd]
+                numZone = len(zoneRa)
+                # The range itself, and its parts that wrap around RA=0
+                wrapLo = numpy.searchsorted(zoneRa, lower + 2*numpy.pi, side="left")
+                wrapHi = numpy.searchsorted(zoneRa, upper - 2*numpy.pi, side="right")
+                ranges = [(numpy.searchsorted(zoneRa, lower, side="left"),
+                           numpy.searchsorted(zoneRa, upper, side="right")),
+                          (numpy.where(wrapLower, wrapLo, numZone), numpy.full(len(points), numZone)),
+                          (numpy.zeros(len(points), dtype=numpy.int64), numpy.where(wrapUpper, wrapHi, 0))]
+                for lo, hi in ranges:
+                    nonEmpty = hi > lo
+                    pointList.append(points[nonEmpty])
+                    loList.append(lo[nonEmpty] + zoneStart)
+                    hiList.append(hi[nonEmpty] + zoneStart)
+        if not pointList:
+            return
+        pointIndex = numpy.concatenate(pointList)
+        lo = numpy.concatenate(loList)
+        hi = numpy.concatenate(hiList)
+        counts = hi - lo
+        cumulative = numpy.cumsum(counts)
+        begin = 0
+        while begin < len(counts):
+            end = numpy.searchsorted(cumulative, cumulative[begin] - counts[begin] + self._maxPairs,
+                                     side="right")
+            end = max(int(end), begin + 1)
+            yield self._expandPairs(vectors, pointIndex[begin:end], lo[begin:end], hi[begin:end])
+            begin = end
+
+    def _expandPairs(self, vectors, pointIndex, lo, hi):
+        """Expand ranges of sorted caps for each point into candidate pairs.
+        """
+        counts = hi - lo
+        firstPair = numpy.cumsum(counts) - counts
+        capSorted = numpy.repeat(lo, counts) + numpy.arange(counts.sum()) - numpy.repeat(firstPair, counts)
+        pointIndex = numpy.repeat(pointIndex, counts)
+        dot = numpy.einsum("ij,ij->i", vectors[pointIndex], self._vectors[capSorted])
+        return pointIndex, capSorted, dot
+
+
+# Minimum height of the Declination zones of a CapIndex (radians), which
+# limits the number of zones for caps that are very small
+_MinZoneHeight = numpy.pi/4096
+
+
+def _runs(values):
+    """Return the start and end indices of the runs of equal values in a
+    1-d array.
+    """
+    if len(values) == 0:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)
+    starts = numpy.flatnonzero(numpy.concatenate(([True], values[1:] != values[:-1])))
+    return starts, numpy.append(starts[1:], len(values))
+
+
+def boundingCaps(vectors, offsets):
+    """Compute spherical caps that contain each of several sets of unit
+    vectors, e.g. the vertices of regions.
+
+    Parameters
+    ----------
+    vectors : array-like of `float`, shape (N, 3)
+        Unit vectors of all the sets, concatenated.
+    offsets : array-like of `int`
+        Index of the first vector of each set, followed by the total number
+        of vectors; the vectors of set ``i`` are ``offsets[i]:offsets[i + 1]``.
+
+    Returns
+    -------
+    centers : `numpy.ndarray` of `float`, shape (M, 3)
+        Unit vector of the center of each cap.
+    radii : `numpy.ndarray` of `float`, shape (M,)
+        Angular radius of each cap (radians); pi (the whole sky) for sets
+        that are empty, contain non-finite vectors, or are spread too widely
+        to determine a useful center.
+
+    Notes
+    -----
+    Each cap is centered on the normalized mean of its vectors, which
+    includes all of a region that is smaller than a hemisphere, but is not
+    necessarily the smallest such cap.
+    """
+    vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+    offsets = numpy.asarray(offsets, dtype=numpy.int64).ravel()
+    counts = numpy.diff(offsets)
+    centers = numpy.zeros((len(counts), 3))
+    centers[:, 2] = 1.0
+    radii = numpy.full(len(counts), numpy.pi)
+    nonEmpty = numpy.flatnonzero(counts > 0)
+    if len(nonEmpty) == 0:
+        return centers, radii
+    starts = offsets[:-1][nonEmpty]
+    sums = numpy.add.reduceat(vectors, starts, axis=0)
+    norms = numpy.sqrt(numpy.einsum("ij,ij->i", sums, sums))
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        sums /= norms[:, numpy.newaxis]
+        setIndex = numpy.repeat(numpy.arange(len(nonEmpty)), counts[nonEmpty])
+        separation = numpy.arccos(numpy.clip(numpy.einsum("ij,ij->i", vectors, sums[setIndex]), -1.0, 1.0))
+        good = norms > 1e-6*counts[nonEmpty]
+    radius = numpy.maximum.reduceat(separation, starts)
+    good &= numpy.isfinite(radius)
+    centers[nonEmpty[good]] = sums[good]
+    radii[nonEmpty[good]] = radius[good]
+    return centers, radii
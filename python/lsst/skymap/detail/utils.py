@@ -20,7 +20,8 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
-__all__ = ["coordFromVec"]
+__all__ = ["coordFromVec", "raDecToArrays", "vectorsToRaDec", "raDecToVectors", "coordListToArrays",
+           "groupIndices"]
 
 import numpy
 
@@ -56,3 +57,117 @@ def coordFromVec(vec, defRA=None):
             decDeg = -90.0
         return geom.SpherePoint(defRA, decDeg*geom.degrees)
     return geom.SpherePoint(lsst.sphgeom.Vector3d(*vec))
+
+
+def raDecToArrays(ra, dec, degrees=False):
+    """Convert Right Ascension and Declination to 1-d arrays of radians.
+
+    Parameters
+    ----------
+    ra, dec : array-like of `float`
+        ICRS Right Ascension and Declination; scalars are accepted.
+    degrees : `bool`
+        Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+    Returns
+    -------
+    ra, dec : `numpy.ndarray` of `float`
+        Right Ascension and Declination (radians) as 1-d arrays.
+
+    Raises
+    ------
+    ValueError
+        If ``ra`` and ``dec`` do not have the same shape.
+    """
+    ra = numpy.atleast_1d(numpy.asarray(ra, dtype=float)).ravel()
+    dec = numpy.atleast_1d(numpy.asarray(dec, dtype=float)).ravel()
+    if ra.shape != dec.shape:
+        raise ValueError("ra and dec have different lengths: %d vs %d" % (len(ra), len(dec)))
+    if degrees:
+        ra = numpy.deg2rad(ra)
+        dec = numpy.deg2rad(dec)
+    return ra, dec
+
+
+def vectorsToRaDec(vectors):
+    """Convert an array of ICRS cartesian vectors to Right Ascension and
+    Declination.
+
+    Parameters
+    ----------
+    vectors : array-like of `float`, shape (N, 3)
+        ICRS cartesian vectors (length is ignored).
+
+    Returns
+    -------
+    ra, dec : `numpy.ndarray` of `float`
+        Right Ascension in [0, 2pi) and Declination (radians).
+    """
+    vectors = numpy.asarray(vectors, dtype=float).reshape(-1, 3)
+    x, y, z = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+    ra = numpy.mod(numpy.arctan2(y, x), 2*numpy.pi)
+    dec = numpy.arctan2(z, numpy.hypot(x, y))
+    return ra, dec
+
+
+def raDecToVectors(ra, dec):
+    """Convert Right Ascension and Declination to ICRS unit vectors.
+
+    Parameters
+    ----------
+    ra, dec : `numpy.ndarray` of `float`
+        Right Ascension and Declination (radians).
+
+    Returns
+    -------
+    vectors : `numpy.ndarray` of `float`, shape (N, 3)
+        ICRS cartesian unit vectors.
+    """
+    cosDec = numpy.cos(dec)
+    return numpy.stack((cosDec*numpy.cos(ra), cosDec*numpy.sin(ra), numpy.sin(dec)), axis=-1)
+
+
+def coordListToArrays(coordList):
+    """Convert a list of `lsst.geom.SpherePoint` to arrays of Right Ascension
+    and Declination.
+
+    Parameters
+    ----------
+    coordList : iterable of `lsst.geom.SpherePoint`
+        ICRS sky coordinates.
+
+    Returns
+    -------
+    ra, dec : `numpy.ndarray` of `float`
+        Right Ascension and Declination (radians).
+    """
+    raDec = numpy.array([(coord.getRa().asRadians(), coord.getDec().asRadians()) for coord in coordList],
+                        dtype=float).reshape(-1, 2)
+    return raDec[:, 0].copy(), raDec[:, 1].copy()
+
+
+def groupIndices(values):
+    """Group the indices of an array by value.
+
+    Parameters
+    ----------
+    values : array-like of `int`
+        Values to group by, e.g. tract IDs.
+
+    Yields
+    ------
+    value : `int`
+        A distinct value, in increasing order.
+    indices : `numpy.ndarray` of `int`
+        Indices (in increasing order) of the elements equal to ``value``.
+    """
+    values = numpy.asarray(values).ravel()
+    if len(values) == 0:
+        return
+    order = numpy.argsort(values, kind="stable")
+    sortedValues = values[order]
+    bounds = numpy.flatnonzero(sortedValues[1:] != sortedValues[:-1]) + 1
+    starts = numpy.concatenate(([0], bounds))
+    ends = numpy.concatenate((bounds, [len(values)]))
+    for start, end in zip(starts, ends):
+        yield sortedValues[start], order[start:end]
@@ -24,8 +24,11 @@ __all__ = ["DiscreteSkyMap"]
 
 import struct
 
+import numpy
+
 from lsst.pex.config import ListField
 import lsst.geom as geom
+from . import detail
 from .cachingSkyMap import CachingSkyMap
 from .tractInfo import ExplicitTractInfo
 
@@ -67,6 +70,88 @@ class DiscreteSkyMap(CachingSkyMap):
         numTracts = len(config.radiusList)
         super(DiscreteSkyMap, self).__init__(numTracts, config, version)
 
+    def _getTractCapIndex(self):
+        """Return an index of bounding caps of the tracts, building it if
+        necessary.
+
+        Unlike the base implementation, the index is built from the
+        configuration, without generating any tracts. Each cap is centered
+        on the tract center and is large enough to include the whole tract:
+        the tract is square with half-size ``radius + tractOverlap``, and is
+        grown to hold a whole number of patches.
+
+        Returns
+        -------
+        index : `lsst.skymap.detail.CapIndex`
+            Index of the tract bounding caps, in tract order.
+        """
+        if self._tractCapIndex is None:
+            ra = numpy.deg2rad(numpy.array(self.config.raList, dtype=float))
+            dec = numpy.deg2rad(numpy.array(self.config.decList, dtype=float))
+            halfSize = numpy.array(self.config.radiusList, dtype=float) + self.config.tractOverlap
+            patchDiagonal = numpy.hypot(*self.config.patchInnerDimensions)*self.config.pixelScale/3600.0
+            # 10% margin for distortion of the projection
+            radii = numpy.deg2rad(1.1*(numpy.sqrt(2.0)*halfSize + patchDiagonal))
+            self._tractCapIndex = detail.CapIndex(detail.raDecToVectors(ra, dec), radii)
+        return self._tractCapIndex
+
+    def _findTractIdArray(self, ra, dec):
+        # Docstring inherited from BaseSkyMap._findTractIdArray
+        return self._getTractCapIndex().queryNearest(detail.raDecToVectors(ra, dec))
+
+    def findAllTracts(self, coord):
+        """Find all tracts which include the specified coord.
+
+        Parameters
+        ----------
+        coord : `lsst.geom.SpherePoint`
+            ICRS sky coordinate to search for.
+
+        Returns
+        -------
+        tractList : `list` of `TractInfo`
+            The tracts which include the specified coord, in order of ID.
+        """
+        tractIdArray = self._findAllTractIdArray(*detail.coordListToArrays([coord]))[0]
+        return [self[int(tractId)] for tractId in tractIdArray if tractId >= 0]
+
+    def findAllTractIdArray(self, ra, dec, degrees=False):
+        """Find all tracts which include each of an array of coordinates.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`, shape (N, M)
+            For each coordinate, the IDs of the tracts which include it, in
+            increasing order, padded with -1. ``M`` is the largest number of
+            tracts including any one coordinate (at least 1).
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._findAllTractIdArray(ra, dec)
+
+    def _findAllTractIdArray(self, ra, dec):
+        """Implementation of `findAllTractIdArray` for 1-d arrays of radians.
+        """
+        pointIndex, tractId = self._getTractCapIndex().query(detail.raDecToVectors(ra, dec))
+        contains = numpy.zeros(len(pointIndex), dtype=bool)
+        for tid, select in detail.groupIndices(tractId):
+            rows = pointIndex[select]
+            contains[select] = self[int(tid)]._containsArray(ra[rows], dec[rows])
+        pointIndex = pointIndex[contains]
+        tractId = tractId[contains]
+
+        counts = numpy.bincount(pointIndex, minlength=len(ra))
+        result = numpy.full((len(ra), max(1, counts.max(initial=0))), -1, dtype=numpy.int64)
+        column = numpy.arange(len(pointIndex)) - (numpy.cumsum(counts) - counts)[pointIndex]
+        result[pointIndex, column] = tractId
+        return result
+
     def generateTract(self, index):
         """Generate TractInfo for the specified tract index."""
         center = geom.SpherePoint(self.config.raList[index], self.config.decList[index], geom.degrees)
@@ -29,6 +29,8 @@ __all__ = ['DodecaSkyMapConfig', 'DodecaSkyMap']
 
 import struct
 
+import numpy
+
 import lsst.pex.config as pexConfig
 import lsst.geom as geom
 from . import detail
@@ -121,20 +123,13 @@ class DodecaSkyMap(BaseSkyMap):
             raise RuntimeError("Version = %s >= (2,0); cannot unpickle" % (version,))
         self.__init__(stateDict["config"])
 
-    def findTract(self, coord):
-        """Find the tract whose inner region includes the coord.
-
-        Parameters
-        ----------
-        coord : `lsst.geom.SpherePoint`
-            ICRS sky coordinate to search for.
-
-        Returns
-        -------
-        tractInfo : `TractInfo`
-            Info for tract whose inner region includes the coord.
-        """
-        return self[self._dodecahedron.getFaceInd(coord.getVector())]
+    def _findTractIdArray(self, ra, dec):
+        # Docstring inherited from BaseSkyMap._findTractIdArray
+        tractId = numpy.full(len(ra), -1, dtype=numpy.int64)
+        valid = numpy.isfinite(ra) & numpy.isfinite(dec)
+        vectors = detail.raDecToVectors(ra[valid], dec[valid])
+        tractId[valid] = self._dodecahedron.getFaceIndArray(vectors)
+        return tractId
 
     def getVersion(self):
         """Return version (e.g. for pickle).
@@ -24,6 +24,8 @@ __all__ = ['EquatSkyMapConfig', 'EquatSkyMap']
 
 import struct
 
+import numpy
+
 import lsst.pex.config as pexConfig
 import lsst.geom as geom
 from .baseSkyMap import BaseSkyMap
@@ -53,6 +55,10 @@ class EquatSkyMap(BaseSkyMap):
     EquatSkyMap represents an equatorial band of sky divided along declination
     into overlapping tracts.
 
+    A coord is in the tract whose RA range includes it. Coords outside
+    ``config.decRange`` are in no tract, so `findTract` raises `LookupError`
+    for them.
+
     Parameters
     ----------
     config : `lsst.skymap.BaseSkyMapConfig` (optional)
@@ -128,6 +134,18 @@ class EquatSkyMap(BaseSkyMap):
             raise RuntimeError("Version = %s >= (2,0); cannot unpickle" % (version,))
         self.__init__(stateDict["config"])
 
+    def _findTractIdArray(self, ra, dec):
+        # Docstring inherited from BaseSkyMap._findTractIdArray
+        tractId = numpy.full(len(ra), -1, dtype=numpy.int64)
+        decMin, decMax = numpy.deg2rad(self.config.decRange)
+        with numpy.errstate(invalid="ignore"):
+            valid = numpy.isfinite(ra) & (dec >= decMin) & (dec <= decMax)
+        tractWidthRA = 2*numpy.pi/self.config.numTracts
+        tractNum = numpy.floor(numpy.mod(ra[valid], 2*numpy.pi)/tractWidthRA).astype(numpy.int64)
+        # Allow wraparound if the modulus rounds up to 2 pi
+        tractId[valid] = numpy.mod(tractNum, self.config.numTracts)
+        return tractId
+
     def getVersion(self):
         """Return version (e.g. for pickle).
 
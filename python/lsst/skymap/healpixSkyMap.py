@@ -106,22 +106,14 @@ class HealpixSkyMap(CachingSkyMap):
         numTracts = healpy.nside2npix(self._nside)
         super(HealpixSkyMap, self).__init__(numTracts, config, version)
 
-    def findTract(self, coord):
-        """Find the tract whose inner region includes the coord.
-
-        Parameters
-        ----------
-        coord : `lsst.geom.SpherePoint`
-            ICRS sky coordinate to search for.
-
-        Returns
-        -------
-        tractInfo : `TractInfo`
-            Info for tract whose inner region includes the coord.
-        """
-        theta, phi = coordToAng(coord)
-        index = healpy.ang2pix(self._nside, theta, phi, nest=self.config.nest)
-        return self[index]
+    def _findTractIdArray(self, ra, dec):
+        # Docstring inherited from BaseSkyMap._findTractIdArray
+        tractId = numpy.full(len(ra), -1, dtype=numpy.int64)
+        valid = numpy.isfinite(ra) & (numpy.abs(dec) <= 0.5*numpy.pi)
+        # Same convention as coordToAng
+        theta = dec[valid] + 0.5*numpy.pi
+        tractId[valid] = healpy.ang2pix(self._nside, theta, ra[valid], nest=self.config.nest)
+        return tractId
 
     def generateTract(self, index):
         """Generate TractInfo for the specified tract index."""
@@ -23,7 +23,7 @@
 __all__ = ["PatchInfo", "makeSkyPolygonFromBBox"]
 
 from lsst.sphgeom import ConvexPolygon
-from lsst.geom import Box2D
+from lsst.geom import Box2D, Box2I
 
 
 def makeSkyPolygonFromBBox(bbox, wcs):
@@ -59,15 +59,27 @@ class PatchInfo:
         inner bounding box
     outerBBox : `lsst.geom.Box2I`
         inner bounding box
+
+    Notes
+    -----
+    PatchInfo is immutable and hashable, and has no instance dict, so that
+    `TractInfo` can cache one instance per patch and share it. The bounding
+    box getters return copies, so the shared instances cannot be changed.
     """
 
+    __slots__ = ("_index", "_innerBBox", "_outerBBox")
+
     def __init__(self, index, innerBBox, outerBBox):
-        self._index = index
-        self._innerBBox = innerBBox
-        self._outerBBox = outerBBox
+        self._index = tuple(int(val) for val in index)
+        self._innerBBox = Box2I(innerBBox)
+        self._outerBBox = Box2I(outerBBox)
         if not outerBBox.contains(innerBBox):
             raise RuntimeError("outerBBox=%s does not contain innerBBox=%s" % (outerBBox, innerBBox))
 
+    def __reduce__(self):
+        """To support pickling."""
+        return (self.__class__, (self._index, self._innerBBox, self._outerBBox))
+
     def getIndex(self):
         """Return patch index: a tuple of (x, y)
 
@@ -86,7 +98,7 @@ class PatchInfo:
         bbox : `lsst.geom.Box2I`
             The inner bounding Box.
         """
-        return self._innerBBox
+        return Box2I(self._innerBBox)
 
     def getOuterBBox(self):
         """Get outer bounding box.
@@ -96,7 +108,7 @@ class PatchInfo:
         bbox : `lsst.geom.Box2I`
             The outer bounding Box.
         """
-        return self._outerBBox
+        return Box2I(self._outerBBox)
 
     def getInnerSkyPolygon(self, tractWcs):
         """Get the inner on-sky region.
@@ -119,12 +131,19 @@ class PatchInfo:
         return makeSkyPolygonFromBBox(bbox=self.getOuterBBox(), wcs=tractWcs)
 
     def __eq__(self, rhs):
-        return (self.getIndex() == rhs.getIndex()) \
-            and (self.getInnerBBox() == rhs.getInnerBBox()) \
-            and (self.getOuterBBox() == rhs.getOuterBBox())
+        if not isinstance(rhs, PatchInfo):
+            return NotImplemented
+        return (self._index == rhs._index) \
+            and (self._innerBBox == rhs._innerBBox) \
+            and (self._outerBBox == rhs._outerBBox)
 
     def __ne__(self, rhs):
-        return not self.__eq__(rhs)
+        result = self.__eq__(rhs)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        # Patches that are equal have the same index
+        return hash(self._index)
 
     def __str__(self):
         return "PatchInfo(index=%s)" % (self.getIndex(),)
@@ -22,11 +22,15 @@
 
 __all__ = ["RingsSkyMapConfig", "RingsSkyMap"]
 
+import bisect
 import struct
 import math
 
+import numpy
+
 from lsst.pex.config import Field
 import lsst.geom as geom
+from . import detail
 from .cachingSkyMap import CachingSkyMap
 from .tractInfo import ExplicitTractInfo
 
@@ -85,7 +89,14 @@ class RingsSkyMap(CachingSkyMap):
             stopDec = startDec + self._ringSize
             dec = min(math.fabs(startDec), math.fabs(stopDec))  # Declination for determining division in RA
             self._ringNums.append(int(2*math.pi*math.cos(dec)/self._ringSize) + 1)
-        numTracts = sum(self._ringNums) + 2
+        # Index of the first tract in each ring, less 1 for the south pole;
+        # the final entry is the total number of tracts in the rings
+        self._ringOffsets = [0]
+        for num in self._ringNums:
+            self._ringOffsets.append(self._ringOffsets[-1] + num)
+        self._ringNumArray = numpy.array(self._ringNums, dtype=numpy.int64)
+        self._ringOffsetArray = numpy.array(self._ringOffsets, dtype=numpy.int64)
+        numTracts = self._ringOffsets[-1] + 2
         super(RingsSkyMap, self).__init__(numTracts, config, version)
         self._raStart = self.config.raStart*geom.degrees
 
@@ -105,19 +116,15 @@ class RingsSkyMap(CachingSkyMap):
             return self.config.numRings, 0
         if index < 0 or index >= self._numTracts:
             raise IndexError("Tract index %d is out of range [0, %d]" % (index, len(self) - 1))
-        ring = 0  # Ring number
-        tractNum = index - 1  # Tract number within ring
+        tractNum = index - 1  # Tract number counting from the first ring
         if self._version == 0:
             # Maintain the off-by-one bug in version=0 (DM-14809).
             # This means that the first tract in the first ring is duplicated
             # and the first tract in the last ring is missing.
-            while ring < self.config.numRings and tractNum > self._ringNums[ring]:
-                tractNum -= self._ringNums[ring]
-                ring += 1
+            ring = bisect.bisect_left(self._ringOffsets, tractNum, 1) - 1
         else:
-            while ring < self.config.numRings and tractNum >= self._ringNums[ring]:
-                tractNum -= self._ringNums[ring]
-                ring += 1
+            ring = bisect.bisect_right(self._ringOffsets, tractNum) - 1
+        tractNum -= self._ringOffsets[ring]
         return ring, tractNum
 
     def generateTract(self, index):
@@ -183,23 +190,86 @@ class RingsSkyMap(CachingSkyMap):
                        (2*math.pi/self._ringNums[ringNum]) + 0.5)
         return 0 if tractNum == self._ringNums[ringNum] else tractNum  # Allow wraparound
 
-    def findTract(self, coord):
-        ringNum = self._decToRingNum(coord.getLatitude())
-        if ringNum == -1:
-            # Southern cap
-            return self[0]
-        if ringNum == self.config.numRings:
-            # Northern cap
-            return self[self._numTracts - 1]
-        tractNum = self._raToTractNum(coord.getLongitude(), ringNum)
+    def _decToRingNumArray(self, dec):
+        """Calculate ring numbers from an array of Declinations.
 
-        if self._version == 0 and tractNum == 0 and ringNum != 0:
+        Parameters
+        ----------
+        dec : `numpy.ndarray` of `float`
+            Declination (radians).
+
+        Returns
+        -------
+        ringNum : `numpy.ndarray` of `int`
+            Ring number, as for ``_decToRingNum``; -2 where ``dec`` is not
+            finite.
+        """
+        firstRingStart = self._ringSize*0.5 - 0.5*math.pi
+        ringNum = numpy.full(len(dec), -2, dtype=numpy.int64)
+        with numpy.errstate(invalid="ignore"):
+            south = dec < firstRingStart
+            north = dec > firstRingStart*-1
+            inRing = ~south & ~north & numpy.isfinite(dec)
+        ringNum[south] = -1
+        ringNum[north] = self.config.numRings
+        ringNum[inRing] = ((dec[inRing] - firstRingStart)/self._ringSize).astype(numpy.int64)
+        return ringNum
+
+    def _raToTractNumArray(self, ra, ringNum):
+        """Calculate tract numbers from an array of Right Ascensions.
+
+        Parameters
+        ----------
+        ra : `numpy.ndarray` of `float`
+            Right Ascension (radians).
+        ringNum : `numpy.ndarray` of `int`
+            Ring number of each coordinate; must not be a polar cap.
+
+        Returns
+        -------
+        tractNum : `numpy.ndarray` of `int`
+            Tract number within the ring, as for ``_raToTractNum``.
+        """
+        numInRing = self._ringNumArray[ringNum]
+        wrapped = numpy.fmod(ra - self._raStart.asRadians(), 2*math.pi)
+        wrapped[wrapped < 0.0] += 2*math.pi
+        tractNum = numpy.floor(wrapped/(2*math.pi/numInRing) + 0.5).astype(numpy.int64)
+        tractNum[tractNum == numInRing] = 0  # Allow wraparound
+        return tractNum
+
+    def _ringTractToIndexArray(self, ringNum, tractNum):
+        """Calculate tract indices from ring and tract numbers.
+
+        This includes the ``version=0`` numbering bug (DM-14809).
+
+        Parameters
+        ----------
+        ringNum : `numpy.ndarray` of `int`
+            Ring number of each tract; must not be a polar cap.
+        tractNum : `numpy.ndarray` of `int`
+            Tract number within the ring.
+
+        Returns
+        -------
+        index : `numpy.ndarray` of `int`
+            Tract index.
+        """
+        if self._version == 0:
             # Account for off-by-one error in getRingIndices
             # Note that this means that tract 1 gets duplicated.
-            ringNum += 1
-
-        index = sum(self._ringNums[:ringNum], tractNum + 1)  # Allow 1 for south pole
-        return self[index]
+            ringNum = ringNum + ((tractNum == 0) & (ringNum != 0))
+        return self._ringOffsetArray[ringNum] + tractNum + 1  # Allow 1 for south pole
+
+    def _findTractIdArray(self, ra, dec):
+        # Docstring inherited from BaseSkyMap._findTractIdArray
+        ringNum = self._decToRingNumArray(dec)
+        tractId = numpy.full(len(dec), -1, dtype=numpy.int64)
+        tractId[ringNum == -1] = 0  # Southern cap
+        tractId[ringNum == self.config.numRings] = self._numTracts - 1  # Northern cap
+        inRing = (ringNum >= 0) & (ringNum < self.config.numRings) & numpy.isfinite(ra)
+        tractNum = self._raToTractNumArray(ra[inRing], ringNum[inRing])
+        tractId[inRing] = self._ringTractToIndexArray(ringNum[inRing], tractNum)
+        return tractId
 
     def findAllTracts(self, coord):
         """Find all tracts which include the specified coord.
@@ -214,51 +284,106 @@ class RingsSkyMap(CachingSkyMap):
         tractList : `list` of `TractInfo`
             The tracts which include the specified coord.
         """
-        ringNum = self._decToRingNum(coord.getLatitude())
+        tractIdArray = self._findAllTractIdArray(*detail.coordListToArrays([coord]))[0]
+        return [self[int(tractId)] for tractId in tractIdArray if tractId >= 0]
+
+    def findAllTractIdArray(self, ra, dec, degrees=False):
+        """Find all tracts which include each of an array of coordinates.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`, shape (N, M)
+            For each coordinate, the IDs of the tracts which include it,
+            in the order returned by `findAllTracts`, padded with -1.
+            The columns correspond to those of `findAllTractCandidateIdArray`.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._findAllTractIdArray(ra, dec)
+
+    def findAllTractCandidateIdArray(self, ra, dec, degrees=False):
+        """Find the tracts that may include each of an array of coordinates.
+
+        These are the tracts checked by `findAllTracts`: the nearest three
+        tracts in each of the nearest three rings, and the two polar caps.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        tractId : `numpy.ndarray` of `int`, shape (N, 11)
+            For each coordinate, the IDs of the candidate tracts; -1 for
+            candidates in rings that do not exist, or if the coordinate is
+            not finite.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._findAllTractCandidateIdArray(ra, dec)
 
-        tractList = list()
+    def _findAllTractCandidateIdArray(self, ra, dec):
+        """Implementation of `findAllTractCandidateIdArray` for 1-d arrays of
+        radians.
+        """
+        ringNum = self._decToRingNumArray(dec)
+        valid = (ringNum > -2) & numpy.isfinite(ra)
+        numInRing = self._ringNumArray
+        columns = []
         # ringNum denotes the closest ring to the specified coord
         # I will check adjacent rings which may include the specified coord
-        for r in [ringNum - 1, ringNum, ringNum + 1]:
-            if r < 0 or r >= self.config.numRings:
-                # Poles will be checked explicitly outside this loop
-                continue
-            tractNum = self._raToTractNum(coord.getLongitude(), r)
+        for deltaRing in (-1, 0, 1):
+            r = ringNum + deltaRing
+            # Poles will be checked explicitly below
+            inRing = valid & (r >= 0) & (r < self.config.numRings)
+            tractNum = self._raToTractNumArray(ra[inRing], r[inRing])
             # Adjacent tracts will also be checked.
-            for t in [tractNum - 1, tractNum, tractNum + 1]:
+            for deltaTract in (-1, 0, 1):
                 # Wrap over raStart
-                if t < 0:
-                    t = t + self._ringNums[r]
-                elif t > self._ringNums[r] - 1:
-                    t = t - self._ringNums[r]
-
-                extra = 0
-                if self._version == 0 and t == 0 and r != 0:
-                    # Account for off-by-one error in getRingIndices
-                    # Note that this means that tract 1 gets duplicated.
-                    extra = 1
-
-                index = sum(self._ringNums[:r + extra], t + 1)  # Allow 1 for south pole
-                tract = self[index]
-                if tract.contains(coord):
-                    tractList.append(tract)
+                t = numpy.mod(tractNum + deltaTract, numInRing[r[inRing]])
+                index = numpy.full(len(ra), -1, dtype=numpy.int64)
+                index[inRing] = self._ringTractToIndexArray(r[inRing], t)
+                columns.append(index)
 
         # Always check tracts at poles
         # Southern cap is 0, Northern cap is the last entry in self
-        for entry in [0, len(self)-1]:
-            tract = self[entry]
-            if tract.contains(coord):
-                tractList.append(tract)
+        for entry in (0, len(self) - 1):
+            columns.append(numpy.where(valid, entry, -1))
+        return numpy.stack(columns, axis=1)
 
-        return tractList
+    def _findAllTractIdArray(self, ra, dec):
+        """Implementation of `findAllTractIdArray` for 1-d arrays of radians.
+        """
+        tractId = self._findAllTractCandidateIdArray(ra, dec)
+        flatTractId = tractId.reshape(-1)
+        for candidate, select in detail.groupIndices(flatTractId):
+            if candidate < 0:
+                continue
+            rows = select//tractId.shape[1]
+            contains = self[int(candidate)]._containsArray(ra[rows], dec[rows])
+            flatTractId[select[~contains]] = -1
+        return tractId
 
     def findTractPatchList(self, coordList):
+        # Docstring inherited from BaseSkyMap.findTractPatchList
+        tractIdArray = self._findAllTractIdArray(*detail.coordListToArrays(coordList)).ravel()
+        tractIdArray = tractIdArray[tractIdArray >= 0]
+        # Each tract is searched once, in order of first appearance
+        tractIds, firstIndex = numpy.unique(tractIdArray, return_index=True)
         retList = []
-        for coord in coordList:
-            for tractInfo in self.findAllTracts(coord):
-                patchList = tractInfo.findPatchList(coordList)
-                if patchList and not (tractInfo, patchList) in retList:
-                    retList.append((tractInfo, patchList))
+        for tractId in tractIds[numpy.argsort(firstIndex)]:
+            tractInfo = self[int(tractId)]
+            patchList = tractInfo.findPatchList(coordList)
+            if patchList:
+                retList.append((tractInfo, patchList))
         return retList
 
     def updateSha1(self, sha1):
@@ -23,13 +23,27 @@
 __all__ = ["TractInfo"]
 
 import numbers
+import threading
+
+import numpy
 
 import lsst.pex.exceptions
 import lsst.geom as geom
 from lsst.sphgeom import ConvexPolygon
 
+from . import detail
 from .patchInfo import PatchInfo, makeSkyPolygonFromBBox
 
+# Relative amount by which lsst.geom.Box2D.include nudges the maximum
+_Box2DEpsilon = 2*numpy.finfo(float).eps
+
+# Number of points sampled along each edge of the tract bounding box to
+# compute the bounding cap of the tract
+_BoundingCapSamples = 16
+
+# Maximum number of patch sky polygons cached by each tract
+_PatchPolygonCacheSize = 256
+
 
 class TractInfo:
     """Information about a tract in a SkyMap sky pixelization
@@ -80,6 +94,10 @@ class TractInfo:
 
     - It is not enforced that ctrCoord is the center of vertexCoordList, but
       SkyMap relies on it.
+
+    The bounding box, number of patches and final WCS are computed on first
+    use (of any of them), exactly once, so that a tract whose center is all
+    that is needed is cheap to construct. A pickled tract includes them.
     """
 
     def __init__(self, id, patchInnerDimensions, patchBorder, ctrCoord, vertexCoordList, tractOverlap, wcs):
@@ -94,9 +112,73 @@ class TractInfo:
         self._vertexCoordList = tuple(vertexCoordList)
         self._tractOverlap = tractOverlap
 
+        # The geometry is computed from the initial WCS on first use
+        self._initialWcs = wcs
+        self._bbox = None
+        self._numPatches = None
+        self._wcs = None
+        self._geometryLock = threading.Lock()
+        self._boundingCap = None
+        # PatchInfo by sequential index, created on first use
+        self._patchCache = None
+        self._innerSkyPolygon = None
+        self._outerSkyPolygon = None
+        # Patch sky polygons by (sequential index, outer?), created on first use
+        self._patchPolygonCache = None
+
+    def __getstate__(self):
+        # Pickle the computed geometry rather than the initial WCS
+        self._ensureGeometry()
+        state = self.__dict__.copy()
+        del state["_geometryLock"]
+        for name in ("_patchCache", "_innerSkyPolygon", "_outerSkyPolygon", "_patchPolygonCache"):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Pickles from before the geometry was lazy have no initial WCS
+        self.__dict__.setdefault("_initialWcs", None)
+        for name in ("_boundingCap", "_patchCache", "_innerSkyPolygon", "_outerSkyPolygon",
+                     "_patchPolygonCache"):
+            self.__dict__.setdefault(name, None)
+        self._geometryLock = threading.Lock()
+
+    def _ensureGeometry(self):
+        """Compute the bounding box, number of patches and final WCS of the
+        tract, if they have not been computed yet.
+        """
+        if self._wcs is None:
+            with self._geometryLock:
+                if self._wcs is None:
+                    bbox, numPatches, wcs = self._computeGeometry(self._initialWcs)
+                    self._bbox = bbox
+                    self._numPatches = numPatches
+                    self._initialWcs = None
+                    # Set last, as it marks the geometry as computed
+                    self._wcs = wcs
+
+    def _computeGeometry(self, wcs):
+        """Compute the geometry of the tract.
+
+        Parameters
+        ----------
+        wcs : `lsst.afw.geom.SkyWcs`
+            Initial WCS of the tract.
+
+        Returns
+        -------
+        bbox : `lsst.geom.Box2I`
+            Final bounding box.
+        numPatches : `lsst.geom.Extent2I`
+            Number of patches in x, y.
+        wcs : `lsst.afw.geom.SkyWcs`
+            Final WCS.
+        """
         minBBox = self._minimumBoundingBox(wcs)
-        initialBBox, self._numPatches = self._setupPatches(minBBox, wcs)
-        self._bbox, self._wcs = self._finalOrientation(initialBBox, wcs)
+        initialBBox, numPatches = self._setupPatches(minBBox, wcs)
+        bbox, wcs = self._finalOrientation(initialBBox, wcs)
+        return bbox, numPatches, wcs
 
     def _minimumBoundingBox(self, wcs):
         """Calculate the minimum bounding box for the tract, given the WCS.
@@ -109,17 +191,17 @@ class TractInfo:
         """
         minBBoxD = geom.Box2D()
         halfOverlap = self._tractOverlap / 2.0
+        coordList = []
         for vertexCoord in self._vertexCoordList:
             if self._tractOverlap == 0:
-                minBBoxD.include(wcs.skyToPixel(vertexCoord))
+                coordList.append(vertexCoord)
             else:
                 numAngles = 24
                 angleIncr = geom.Angle(360.0, geom.degrees) / float(numAngles)
                 for i in range(numAngles):
                     offAngle = angleIncr * i
-                    offCoord = vertexCoord.offset(offAngle, halfOverlap)
-                    pixPos = wcs.skyToPixel(offCoord)
-                    minBBoxD.include(pixPos)
+                    coordList.append(vertexCoord.offset(offAngle, halfOverlap))
+        _includeSkyCoords(minBBoxD, coordList, wcs)
         return minBBoxD
 
     def _setupPatches(self, minBBox, wcs):
@@ -195,11 +277,89 @@ class TractInfo:
         return nx*y + x
 
     def getPatchIndexPair(self, sequentialIndex):
+        """Convert a sequential patch index, as returned by
+        `getSequentialPatchIndex`, to a patch index.
+
+        Returns
+        -------
+        index : `tuple` of `int`
+            Patch index (x, y).
+        """
         nx, ny = self.getNumPatches()
-        x = sequentialIndex % nx
-        y = (sequentialIndex - x) / nx
+        y, x = divmod(int(sequentialIndex), nx)
         return (x, y)
 
+    def getSequentialPatchIndexArray(self, patchX, patchY):
+        """Convert arrays of patch indices to sequential patch indices.
+
+        Parameters
+        ----------
+        patchX, patchY : array-like of `int`
+            Patch indices in x and y.
+
+        Returns
+        -------
+        sequentialIndex : `numpy.ndarray` of `int`
+            Sequential patch index, as returned by `getSequentialPatchIndex`;
+            -1 where the patch index is out of range.
+        """
+        patchX = numpy.asarray(patchX, dtype=numpy.int64)
+        patchY = numpy.asarray(patchY, dtype=numpy.int64)
+        nx, ny = self.getNumPatches()
+        valid = (patchX >= 0) & (patchX < nx) & (patchY >= 0) & (patchY < ny)
+        return numpy.where(valid, nx*patchY + patchX, -1)
+
+    def getPatchIndexPairArray(self, sequentialIndex):
+        """Convert an array of sequential patch indices to patch indices.
+
+        Parameters
+        ----------
+        sequentialIndex : array-like of `int`
+            Sequential patch indices, as returned by
+            `getSequentialPatchIndex`.
+
+        Returns
+        -------
+        patchX, patchY : `numpy.ndarray` of `int`
+            Patch indices in x and y; -1 where the sequential index is out
+            of range.
+        """
+        sequentialIndex = numpy.asarray(sequentialIndex, dtype=numpy.int64)
+        nx, ny = self.getNumPatches()
+        valid = (sequentialIndex >= 0) & (sequentialIndex < nx*ny)
+        patchY, patchX = numpy.divmod(sequentialIndex, nx)
+        return numpy.where(valid, patchX, -1), numpy.where(valid, patchY, -1)
+
+    def getPatchBBoxArrays(self):
+        """Return the inner and outer bounding boxes of all the patches.
+
+        Returns
+        -------
+        innerBBoxes, outerBBoxes : `numpy.ndarray` of `int`, shape (N, 4)
+            Inner and outer bounding box of each patch, as columns of minimum
+            x, minimum y, maximum x and maximum y (inclusive, as for
+            `lsst.geom.Box2I`); row ``i`` is the patch with sequential index
+            ``i``. These are the bounding boxes of the patches returned by
+            `getPatchInfo`, computed without creating them.
+        """
+        nx, ny = self.getNumPatches()
+        patchX, patchY = self.getPatchIndexPairArray(numpy.arange(nx*ny, dtype=numpy.int64))
+        innerDimX, innerDimY = self.getPatchInnerDimensions()
+        innerBBoxes = numpy.empty((nx*ny, 4), dtype=numpy.int64)
+        innerBBoxes[:, 0] = patchX*innerDimX
+        innerBBoxes[:, 1] = patchY*innerDimY
+        innerBBoxes[:, 2] = innerBBoxes[:, 0] + innerDimX - 1
+        innerBBoxes[:, 3] = innerBBoxes[:, 1] + innerDimY - 1
+
+        bbox = self.getBBox()
+        border = self.getPatchBorder()
+        outerBBoxes = numpy.empty_like(innerBBoxes)
+        outerBBoxes[:, 0] = numpy.maximum(innerBBoxes[:, 0] - border, bbox.getMinX())
+        outerBBoxes[:, 1] = numpy.maximum(innerBBoxes[:, 1] - border, bbox.getMinY())
+        outerBBoxes[:, 2] = numpy.minimum(innerBBoxes[:, 2] + border, bbox.getMaxX())
+        outerBBoxes[:, 3] = numpy.minimum(innerBBoxes[:, 3] + border, bbox.getMaxY())
+        return innerBBoxes, outerBBoxes
+
     def findPatch(self, coord):
         """Find the patch containing the specified coord.
 
@@ -219,16 +379,178 @@ class TractInfo:
             If coord is not in tract or we cannot determine the
             pixel coordinate (which likely means the coord is off the tract).
         """
+        patchX, patchY, _ = self._findPatchArray(*detail.coordListToArrays([coord]))
+        if patchX[0] < 0:
+            raise LookupError("coord %s is not in tract %s" % (coord, self.getId()))
+        return self.getPatchInfo((int(patchX[0]), int(patchY[0])))
+
+    def findPatchArray(self, ra, dec, degrees=False):
+        """Find the patch containing each of an array of coordinates.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to search for.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        patchX, patchY : `numpy.ndarray` of `int`
+            Index of the patch whose inner bbox contains each coordinate;
+            -1 where the coordinate is not in the tract.
+        patchIndex : `numpy.ndarray` of `int`
+            Sequential patch index, as returned by `getSequentialPatchIndex`;
+            -1 where the coordinate is not in the tract.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._findPatchArray(ra, dec)
+
+    def _findPatchArray(self, ra, dec):
+        """Implementation of `findPatchArray` for 1-d arrays of radians."""
+        x, y = self._skyToPixelArray(ra, dec, select=self._nearArray(ra, dec))
+        xInd, yInd, inside = self._pixelToIndexArray(x, y)
+        patchX = numpy.full(len(ra), -1, dtype=numpy.int64)
+        patchY = numpy.full(len(ra), -1, dtype=numpy.int64)
+        patchIndex = numpy.full(len(ra), -1, dtype=numpy.int64)
+        patchX[inside] = xInd[inside]//self._patchInnerDimensions[0]
+        patchY[inside] = yInd[inside]//self._patchInnerDimensions[1]
+        patchIndex[inside] = self.getNumPatches()[0]*patchY[inside] + patchX[inside]
+        return patchX, patchY, patchIndex
+
+    def _skyToPixelArray(self, ra, dec, select=None):
+        """Compute pixel positions for arrays of sky coordinates.
+
+        Parameters
+        ----------
+        ra, dec : `numpy.ndarray` of `float`
+            ICRS Right Ascension and Declination (radians), as 1-d arrays.
+        select : `numpy.ndarray` of `bool`, optional
+            Which coordinates to transform; the pixel position of the others
+            is NaN. If None, transform all coordinates.
+
+        Returns
+        -------
+        x, y : `numpy.ndarray` of `float`
+            Pixel position in the tract; NaN where the pixel position cannot
+            be determined (which likely means the coord is way off the tract).
+        """
+        x = numpy.full(len(ra), numpy.nan)
+        y = numpy.full(len(ra), numpy.nan)
+        with numpy.errstate(invalid="ignore"):
+            valid = numpy.isfinite(ra) & (numpy.abs(dec) <= 0.5*numpy.pi)
+        if select is not None:
+            valid &= select
+        valid = numpy.flatnonzero(valid)
+        if len(valid) == 0:
+            return x, y
+        wcs = self.getWcs()
         try:
-            pixel = self.getWcs().skyToPixel(coord)
+            # One transform for all points; positions that cannot be
+            # computed come back as NaN
+            pixels = wcs.getTransform().applyInverse(numpy.array([ra[valid], dec[valid]]))
         except (lsst.pex.exceptions.DomainError, lsst.pex.exceptions.RuntimeError):
-            # Point must be way off the tract
-            raise LookupError("Unable to determine pixel position for coordinate %s" % (coord,))
-        pixelInd = geom.Point2I(pixel)
-        if not self.getBBox().contains(pixelInd):
-            raise LookupError("coord %s is not in tract %s" % (coord, self.getId()))
-        patchInd = tuple(int(pixelInd[i]/self._patchInnerDimensions[i]) for i in range(2))
-        return self.getPatchInfo(patchInd)
+            # Fall back to transforming the points one at a time, so that
+            # one bad point does not lose the others
+            for i in valid:
+                try:
+                    pixel = wcs.skyToPixel(geom.SpherePoint(ra[i], dec[i], geom.radians))
+                except (lsst.pex.exceptions.DomainError, lsst.pex.exceptions.RuntimeError):
+                    continue
+                x[i], y[i] = pixel
+            return x, y
+        x[valid] = pixels[0]
+        y[valid] = pixels[1]
+        return x, y
+
+    def _getBoundingCap(self):
+        """Return a spherical cap that contains the tract, computing it if
+        necessary.
+
+        Returns
+        -------
+        center : `numpy.ndarray` of `float`, shape (3,)
+            ICRS unit vector of the center of the tract.
+        radius : `float`
+            Angular radius of the cap (radians); pi (the whole sky) if it
+            cannot be determined.
+
+        Notes
+        -----
+        The cap is centered on the tract center, and its radius is the
+        largest separation of points sampled along the edge of the tract
+        bounding box (grown by a pixel to allow for rounding), plus the
+        spacing of the samples and a 1% margin. Coordinates outside the cap
+        can be rejected with a dot product, without using the WCS.
+        """
+        if self._boundingCap is None:
+            center = detail.raDecToVectors(*detail.coordListToArrays([self._ctrCoord]))[0]
+            bbox = geom.Box2D(self.getBBox())
+            bbox.grow(1.0)
+            xMin, yMin, xMax, yMax = bbox.getMinX(), bbox.getMinY(), bbox.getMaxX(), bbox.getMaxY()
+            step = numpy.linspace(0.0, 1.0, _BoundingCapSamples, endpoint=False)
+            x = numpy.concatenate((xMin + (xMax - xMin)*step, numpy.full(len(step), xMax),
+                                   xMax - (xMax - xMin)*step, numpy.full(len(step), xMin)))
+            y = numpy.concatenate((numpy.full(len(step), yMin), yMin + (yMax - yMin)*step,
+                                   numpy.full(len(step), yMax), yMax - (yMax - yMin)*step))
+            ra, dec = self.getWcs().getTransform().applyForward(numpy.array([x, y]))
+            vectors = detail.raDecToVectors(ra, dec)
+            if numpy.all(numpy.isfinite(vectors)):
+                separation = numpy.arccos(numpy.clip(vectors @ center, -1.0, 1.0))
+                spacing = numpy.arccos(numpy.clip(numpy.einsum("ij,ij->i", vectors,
+                                                               numpy.roll(vectors, -1, axis=0)), -1.0, 1.0))
+                radius = min(numpy.pi, 1.01*(separation.max() + spacing.max()))
+            else:
+                radius = numpy.pi
+            self._boundingCap = (center, float(radius))
+        return self._boundingCap
+
+    def _nearArray(self, ra, dec):
+        """Are coordinates within the bounding cap of the tract?
+
+        Parameters
+        ----------
+        ra, dec : `numpy.ndarray` of `float`
+            ICRS Right Ascension and Declination (radians), as 1-d arrays.
+
+        Returns
+        -------
+        near : `numpy.ndarray` of `bool`
+            Whether each coordinate is within the bounding cap; coordinates
+            that are not may be rejected without using the WCS.
+        """
+        center, radius = self._getBoundingCap()
+        with numpy.errstate(invalid="ignore"):
+            return detail.raDecToVectors(ra, dec) @ center >= numpy.cos(radius)
+
+    def _pixelToIndexArray(self, x, y):
+        """Round pixel positions to integer pixel indices and check whether
+        they are in the tract bounding box.
+
+        Rounding matches that of `lsst.geom.Point2I` constructed from a
+        `lsst.geom.Point2D`.
+
+        Parameters
+        ----------
+        x, y : `numpy.ndarray` of `float`
+            Pixel positions; may be NaN.
+
+        Returns
+        -------
+        xInd, yInd : `numpy.ndarray` of `int`
+            Integer pixel indices; only meaningful where ``inside`` is True.
+        inside : `numpy.ndarray` of `bool`
+            Is the pixel in the tract bounding box?
+        """
+        bbox = self.getBBox()
+        xRound = numpy.floor(x + 0.5)
+        yRound = numpy.floor(y + 0.5)
+        with numpy.errstate(invalid="ignore"):
+            inside = ((xRound >= bbox.getMinX()) & (xRound <= bbox.getMaxX()) &
+                      (yRound >= bbox.getMinY()) & (yRound <= bbox.getMaxY()))
+        xInd = numpy.where(inside, xRound, 0).astype(numpy.int64)
+        yInd = numpy.where(inside, yRound, 0).astype(numpy.int64)
+        return xInd, yInd, inside
 
     def findPatchList(self, coordList):
         """Find patches containing the specified list of coords.
@@ -254,30 +576,117 @@ class TractInfo:
         - This uses a naive algorithm that may find some patches that do not
           overlap the region (especially if the region is not a rectangle
           aligned along patch x,y).
+
+        - Regions whose vertices are far from the tract (outside its bounding
+          cap) are rejected before using the WCS.
         """
-        box2D = geom.Box2D()
-        for coord in coordList:
-            try:
-                pixelPos = self.getWcs().skyToPixel(coord)
-            except (lsst.pex.exceptions.DomainError, lsst.pex.exceptions.RuntimeError):
-                # the point is so far off the tract that its pixel position cannot be computed
-                continue
-            box2D.include(pixelPos)
-        bbox = geom.Box2I(box2D)
-        bbox.grow(self.getPatchBorder())
-        bbox.clip(self.getBBox())
-        if bbox.isEmpty():
+        ra, dec = detail.coordListToArrays(coordList)
+        xMin, yMin, xMax, yMax = (int(value[0]) for value in
+                                  self._findPatchRangeArray(ra, dec, numpy.array([0, len(ra)])))
+        if xMin < 0:
             return ()
-
-        llPatchInd = tuple(int(bbox.getMin()[i]/self._patchInnerDimensions[i]) for i in range(2))
-        urPatchInd = tuple(int(bbox.getMax()[i]/self._patchInnerDimensions[i]) for i in range(2))
         return tuple(self.getPatchInfo((xInd, yInd))
-                     for xInd in range(llPatchInd[0], urPatchInd[0]+1)
-                     for yInd in range(llPatchInd[1], urPatchInd[1]+1))
+                     for xInd in range(xMin, xMax + 1)
+                     for yInd in range(yMin, yMax + 1))
+
+    def findPatchRangeArray(self, ra, dec, offsets, degrees=False):
+        """Find the patches that overlap each of many small regions.
+
+        This is the array equivalent of calling `findPatchList` for each
+        region, with all vertices transformed through the WCS at once.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination of the vertices of all the
+            regions, concatenated.
+        offsets : array-like of `int`
+            Index of the first vertex of each region, followed by the total
+            number of vertices; the vertices of region ``i`` are
+            ``offsets[i]:offsets[i + 1]``.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        patchXMin, patchYMin, patchXMax, patchYMax : `numpy.ndarray` of `int`
+            Inclusive range of patch indices overlapping each region, as would
+            be found by `findPatchList`; -1 for regions that do not overlap
+            the tract.
+
+        Raises
+        ------
+        ValueError
+            If ``offsets`` is not consistent with the number of vertices.
+
+        Notes
+        -----
+        The same warnings apply as for `findPatchList`, and regions far from
+        the tract are rejected in the same way.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        offsets = numpy.asarray(offsets, dtype=numpy.int64).ravel()
+        if (len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(ra) or
+                numpy.any(numpy.diff(offsets) < 0)):
+            raise ValueError("offsets must increase from 0 to the number of vertices (%d)" % (len(ra),))
+        return self._findPatchRangeArray(ra, dec, offsets)
+
+    def _findPatchRangeArray(self, ra, dec, offsets):
+        """Implementation of `findPatchRangeArray` for 1-d arrays of radians
+        and valid offsets.
+        """
+        numRegions = len(offsets) - 1
+
+        # Regions whose bounding cap does not intersect that of the tract
+        # cannot overlap it; do not transform their vertices
+        center, radius = self._getBoundingCap()
+        regionCenters, regionRadii = detail.boundingCaps(detail.raDecToVectors(ra, dec), offsets)
+        with numpy.errstate(invalid="ignore"):
+            near = (numpy.arccos(numpy.clip(regionCenters @ center, -1.0, 1.0)) <=
+                    radius + regionRadii)
+        x, y = self._skyToPixelArray(ra, dec, select=numpy.repeat(near, numpy.diff(offsets)))
+
+        # Bounding box of the vertices of each region, ignoring vertices
+        # whose pixel position cannot be computed
+        minX = numpy.full(numRegions, numpy.nan)
+        minY = numpy.full(numRegions, numpy.nan)
+        maxX = numpy.full(numRegions, numpy.nan)
+        maxY = numpy.full(numRegions, numpy.nan)
+        nonEmpty = offsets[1:] > offsets[:-1]
+        starts = offsets[:-1][nonEmpty]
+        if len(starts) > 0:
+            minX[nonEmpty] = numpy.fmin.reduceat(x, starts)
+            minY[nonEmpty] = numpy.fmin.reduceat(y, starts)
+            maxX[nonEmpty] = numpy.fmax.reduceat(x, starts)
+            maxY[nonEmpty] = numpy.fmax.reduceat(y, starts)
+        # lsst.geom.Box2D.include nudges the maximum up by a few ULP
+        maxX += numpy.abs(maxX)*_Box2DEpsilon
+        maxY += numpy.abs(maxY)*_Box2DEpsilon
+
+        # Convert to an integer box as lsst.geom.Box2I(Box2D) does (expanding),
+        # then grow by the patch border and clip to the tract
+        bbox = self.getBBox()
+        border = self.getPatchBorder()
+        with numpy.errstate(invalid="ignore"):
+            minX = numpy.maximum(numpy.floor(minX + 0.5) - border, bbox.getMinX())
+            minY = numpy.maximum(numpy.floor(minY + 0.5) - border, bbox.getMinY())
+            maxX = numpy.minimum(numpy.ceil(maxX - 0.5) + border, bbox.getMaxX())
+            maxY = numpy.minimum(numpy.ceil(maxY - 0.5) + border, bbox.getMaxY())
+            overlaps = (minX <= maxX) & (minY <= maxY)
+
+        innerDims = self.getPatchInnerDimensions()
+        result = []
+        for pixels, dim in ((minX, innerDims[0]), (minY, innerDims[1]),
+                            (maxX, innerDims[0]), (maxY, innerDims[1])):
+            patchInd = numpy.full(numRegions, -1, dtype=numpy.int64)
+            patchInd[overlaps] = pixels[overlaps].astype(numpy.int64)//dim
+            result.append(patchInd)
+        return tuple(result)
 
     def getBBox(self):
         """Get bounding box of tract (as an geom.Box2I)
         """
+        self._ensureGeometry()
         return geom.Box2I(self._bbox)
 
     def getCtrCoord(self):
@@ -299,6 +708,7 @@ class TractInfo:
         result : `tuple` of `int`
             The number of patches in x, y
         """
+        self._ensureGeometry()
         return self._numPatches
 
     def getPatchBorder(self):
@@ -323,13 +733,35 @@ class TractInfo:
         ------
         IndexError
             If index is out of range.
+
+        Notes
+        -----
+        The PatchInfo for each patch is created once and cached, so the same
+        (immutable) instance is returned for every request for a patch.
         """
+        self._ensureGeometry()
         if isinstance(index, numbers.Number):
             index = self.getPatchIndexPair(index)
         if (not 0 <= index[0] < self._numPatches[0]) \
                 or (not 0 <= index[1] < self._numPatches[1]):
             raise IndexError("Patch index %s is not in range [0-%d, 0-%d]" %
                              (index, self._numPatches[0]-1, self._numPatches[1]-1))
+        index = (int(index[0]), int(index[1]))
+        patchCache = self._patchCache
+        if patchCache is None:
+            # Concurrent callers may each create a cache, or a PatchInfo;
+            # the copies are equal, so this is harmless
+            patchCache = self._patchCache = [None]*(self._numPatches[0]*self._numPatches[1])
+        sequentialIndex = self._numPatches[0]*index[1] + index[0]
+        patchInfo = patchCache[sequentialIndex]
+        if patchInfo is None:
+            patchInfo = self._makePatchInfo(index)
+            patchCache[sequentialIndex] = patchInfo
+        return patchInfo
+
+    def _makePatchInfo(self, index):
+        """Create the PatchInfo for a valid patch index (a pair of ints).
+        """
         innerMin = geom.Point2I(*[index[i] * self._patchInnerDimensions[i] for i in range(2)])
         innerBBox = geom.Box2I(innerMin, self._patchInnerDimensions)
         if not self._bbox.contains(innerBBox):
@@ -367,14 +799,82 @@ class TractInfo:
 
     def getInnerSkyPolygon(self):
         """Get inner on-sky region as a sphgeom.ConvexPolygon.
+
+        The polygon is computed on first use and cached.
         """
-        skyUnitVectors = [sp.getVector() for sp in self.getVertexList()]
-        return ConvexPolygon.convexHull(skyUnitVectors)
+        if self._innerSkyPolygon is None:
+            skyUnitVectors = [sp.getVector() for sp in self.getVertexList()]
+            self._innerSkyPolygon = ConvexPolygon.convexHull(skyUnitVectors)
+        return self._innerSkyPolygon
 
     def getOuterSkyPolygon(self):
         """Get outer on-sky region as a sphgeom.ConvexPolygon
+
+        The polygon is computed on first use and cached.
+        """
+        if self._outerSkyPolygon is None:
+            self._outerSkyPolygon = makeSkyPolygonFromBBox(bbox=self.getBBox(), wcs=self.getWcs())
+        return self._outerSkyPolygon
+
+    def getPatchInnerSkyPolygon(self, index):
+        """Get the inner on-sky region of a patch.
+
+        Parameters
+        ----------
+        index : `tuple` of `int` or `int`
+            Index of the patch, as for `getPatchInfo`.
+
+        Returns
+        -------
+        polygon : `lsst.sphgeom.ConvexPolygon`
+            The inner sky region, as returned by
+            `PatchInfo.getInnerSkyPolygon` with the WCS of this tract.
+
+        Notes
+        -----
+        The polygons of recently used patches are cached, up to a bounded
+        number per tract.
+        """
+        return self._getPatchSkyPolygon(index, outer=False)
+
+    def getPatchOuterSkyPolygon(self, index):
+        """Get the outer on-sky region of a patch.
+
+        Parameters
+        ----------
+        index : `tuple` of `int` or `int`
+            Index of the patch, as for `getPatchInfo`.
+
+        Returns
+        -------
+        polygon : `lsst.sphgeom.ConvexPolygon`
+            The outer sky region, as returned by
+            `PatchInfo.getOuterSkyPolygon` with the WCS of this tract.
+
+        Notes
+        -----
+        The polygons of recently used patches are cached, up to a bounded
+        number per tract.
+        """
+        return self._getPatchSkyPolygon(index, outer=True)
+
+    def _getPatchSkyPolygon(self, index, outer):
+        """Implementation of `getPatchInnerSkyPolygon` and
+        `getPatchOuterSkyPolygon`.
         """
-        return makeSkyPolygonFromBBox(bbox=self.getBBox(), wcs=self.getWcs())
+        patchInfo = self.getPatchInfo(index)
+        cache = self._patchPolygonCache
+        if cache is None:
+            cache = self._patchPolygonCache = detail.LruCache(_PatchPolygonCacheSize)
+        key = (self.getSequentialPatchIndex(patchInfo), outer)
+        polygon = cache.get(key)
+        if polygon is None:
+            if outer:
+                polygon = patchInfo.getOuterSkyPolygon(self.getWcs())
+            else:
+                polygon = patchInfo.getInnerSkyPolygon(self.getWcs())
+            cache.put(key, polygon)
+        return polygon
 
     def getWcs(self):
         """Get WCS of tract.
@@ -384,6 +884,7 @@ class TractInfo:
         wcs : `lsst.afw.geom.SkyWcs`
             The WCS of this tract
         """
+        self._ensureGeometry()
         return self._wcs
 
     def __str__(self):
@@ -407,12 +908,30 @@ class TractInfo:
 
     def contains(self, coord):
         """Does this tract contain the coordinate?"""
-        try:
-            pixels = self.getWcs().skyToPixel(coord)
-        except (lsst.pex.exceptions.DomainError, lsst.pex.exceptions.RuntimeError):
-            # Point must be way off the tract
-            return False
-        return self.getBBox().contains(geom.Point2I(pixels))
+        return bool(self._containsArray(*detail.coordListToArrays([coord]))[0])
+
+    def containsArray(self, ra, dec, degrees=False):
+        """Does this tract contain each of an array of coordinates?
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination to test.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+
+        Returns
+        -------
+        contains : `numpy.ndarray` of `bool`
+            Whether the tract contains each coordinate.
+        """
+        ra, dec = detail.raDecToArrays(ra, dec, degrees=degrees)
+        return self._containsArray(ra, dec)
+
+    def _containsArray(self, ra, dec):
+        """Implementation of `containsArray` for 1-d arrays of radians."""
+        x, y = self._skyToPixelArray(ra, dec, select=self._nearArray(ra, dec))
+        return self._pixelToIndexArray(x, y)[2]
 
 
 class ExplicitTractInfo(TractInfo):
@@ -420,6 +939,9 @@ class ExplicitTractInfo(TractInfo):
 
     A tract is placed at the explicitly defined coordinates, with the nominated
     radius.  The tracts are square (i.e., the radius is really a half-size).
+
+    The vertices are the corners of the final bounding box, so they are
+    computed on first use along with the rest of the geometry.
     """
 
     def __init__(self, ident, patchInnerDimensions, patchBorder, ctrCoord, radius, tractOverlap, wcs):
@@ -428,19 +950,62 @@ class ExplicitTractInfo(TractInfo):
         self._radius = radius
         super(ExplicitTractInfo, self).__init__(ident, patchInnerDimensions, patchBorder, ctrCoord,
                                                 vertexList, tractOverlap, wcs)
+
+    def _computeGeometry(self, wcs):
+        # Docstring inherited from TractInfo._computeGeometry
+        bbox, numPatches, finalWcs = super(ExplicitTractInfo, self)._computeGeometry(wcs)
         # Shrink the box slightly to make sure the vertices are in the tract
-        bboxD = geom.BoxD(self.getBBox())
+        bboxD = geom.BoxD(bbox)
         bboxD.grow(-0.001)
-        finalWcs = self.getWcs()
         self._vertexCoordList = finalWcs.pixelToSky(bboxD.getCorners())
+        return bbox, numPatches, finalWcs
+
+    def getVertexList(self):
+        # Docstring inherited from TractInfo.getVertexList
+        self._ensureGeometry()
+        return self._vertexCoordList
 
     def _minimumBoundingBox(self, wcs):
         """Calculate the minimum bounding box for the tract, given the WCS, and
         the nominated radius.
         """
         bbox = geom.Box2D()
-        for i in range(4):
-            cornerCoord = self._ctrCoord.offset(i*90*geom.degrees, self._radius + self._tractOverlap)
-            pixPos = wcs.skyToPixel(cornerCoord)
-            bbox.include(pixPos)
+        coordList = [self._ctrCoord.offset(i*90*geom.degrees, self._radius + self._tractOverlap)
+                     for i in range(4)]
+        _includeSkyCoords(bbox, coordList, wcs)
         return bbox
+
+
+def _includeSkyCoords(bbox, coordList, wcs):
+    """Expand a bounding box to include the pixel positions of sky
+    coordinates.
+
+    The coordinates are transformed with a single call to the WCS transform;
+    the result is identical to including ``wcs.skyToPixel(coord)`` for each
+    coordinate in turn, which is done instead if any coordinate cannot be
+    transformed.
+
+    Parameters
+    ----------
+    bbox : `lsst.geom.Box2D`
+        Bounding box to expand in place.
+    coordList : `list` of `lsst.geom.SpherePoint`
+        ICRS sky coordinates to include.
+    wcs : `lsst.afw.geom.SkyWcs`
+        WCS defining the pixel positions.
+    """
+    if not coordList:
+        return
+    ra, dec = detail.coordListToArrays(coordList)
+    try:
+        pixels = wcs.getTransform().applyInverse(numpy.array([ra, dec]))
+    except (lsst.pex.exceptions.DomainError, lsst.pex.exceptions.RuntimeError):
+        pixels = None
+    if pixels is None or not numpy.all(numpy.isfinite(pixels)):
+        for coord in coordList:
+            bbox.include(wcs.skyToPixel(coord))
+        return
+    # Include the points in order, as lsst.geom.Box2D.include nudges the
+    # maximum each time it is extended
+    for x, y in pixels.T:
+        bbox.include(geom.Point2D(float(x), float(y)))
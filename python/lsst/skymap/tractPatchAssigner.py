@@ -0,0 +1,361 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+
+__all__ = ["TractPatchAssigner", "ParallelTractPatchAssigner"]
+
+import concurrent.futures
+import os
+
+import numpy
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8; ParallelTractPatchAssigner works serially
+    shared_memory = None
+
+from .skyMapRegistry import skyMapRegistry
+
+
+class TractPatchAssigner:
+    """Assign a tract and patch to each row of a catalog.
+
+    Parameters
+    ----------
+    skyMap : `lsst.skymap.BaseSkyMap`
+        Sky map defining the tracts and patches.
+    chunkSize : `int`, optional
+        Maximum number of rows processed at once; bounds the memory used
+        for temporary arrays, whatever the size of the catalog.
+
+    Notes
+    -----
+    Assignments are returned as structured arrays with the fields given by
+    `dtype`:
+
+    ``tract``
+        ID of the tract, as found by `~lsst.skymap.BaseSkyMap.findTract`.
+    ``patch_x``, ``patch_y``
+        Index of the patch within the tract.
+    ``patch``
+        Sequential index of the patch within the tract, as returned by
+        `~lsst.skymap.TractInfo.getSequentialPatchIndex`.
+
+    All fields are -1 for rows that cannot be assigned (e.g. non-finite
+    coordinates), and the patch fields are -1 for rows that are outside the
+    bounding box of their tract.
+
+    Each chunk is assigned by `~lsst.skymap.BaseSkyMap.findTractPatchArray`:
+    one vectorized tract lookup for all the rows, then one WCS transform
+    for the rows in each tract.
+    """
+
+    dtype = numpy.dtype([("tract", numpy.int64), ("patch_x", numpy.int64),
+                         ("patch_y", numpy.int64), ("patch", numpy.int64)])
+    """Data type of the assignments (`numpy.dtype`)."""
+
+    def __init__(self, skyMap, chunkSize=1 << 20):
+        if chunkSize < 1:
+            raise ValueError("chunkSize=%s; must be positive" % (chunkSize,))
+        self.skyMap = skyMap
+        self.chunkSize = int(chunkSize)
+
+    @classmethod
+    def fromRegistry(cls, name, config=None, **kwargs):
+        """Construct an assigner for a sky map in the sky map registry.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the sky map class in `lsst.skymap.skyMapRegistry`,
+            e.g. "rings".
+        config : `lsst.skymap.BaseSkyMapConfig`, optional
+            Configuration for the sky map; if None use the default config.
+        **kwargs
+            Additional arguments for the constructor.
+
+        Returns
+        -------
+        assigner : `TractPatchAssigner`
+            The assigner.
+        """
+        SkyMapClass = skyMapRegistry[name]
+        if config is None:
+            config = SkyMapClass.ConfigClass()
+        return cls(SkyMapClass(config=config), **kwargs)
+
+    def assign(self, ra, dec, degrees=False, out=None):
+        """Assign a tract and patch to each row of a catalog.
+
+        Parameters
+        ----------
+        ra, dec : array-like of `float`
+            ICRS Right Ascension and Declination columns of the catalog,
+            e.g. `numpy.memmap` arrays for catalogs too large for memory.
+        degrees : `bool`, optional
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+        out : `numpy.ndarray`, optional
+            Array of `dtype` and the same length as ``ra`` in which to
+            write the assignments; if None a new array is allocated.
+
+        Returns
+        -------
+        result : `numpy.ndarray` of `dtype`
+            The assignment for each row.
+
+        Raises
+        ------
+        ValueError
+            If ``ra``, ``dec`` and ``out`` do not have the same length, or
+            ``out`` does not have the right dtype.
+        """
+        ra = numpy.asarray(ra).reshape(-1)
+        dec = numpy.asarray(dec).reshape(-1)
+        if len(ra) != len(dec):
+            raise ValueError("ra and dec have different lengths: %d vs %d" % (len(ra), len(dec)))
+        if out is None:
+            out = numpy.empty(len(ra), dtype=self.dtype)
+        elif out.shape != (len(ra),) or out.dtype != self.dtype:
+            raise ValueError("out must be a 1-d array of %d rows with dtype %s" % (len(ra), self.dtype))
+        for start in range(0, len(ra), self.chunkSize):
+            stop = min(start + self.chunkSize, len(ra))
+            self._assignChunk(ra[start:stop], dec[start:stop], degrees, out[start:stop])
+        return out
+
+    def assignChunks(self, chunks, degrees=False):
+        """Assign a tract and patch to each row of a catalog that is read in
+        chunks.
+
+        Parameters
+        ----------
+        chunks : iterable of (array-like of `float`, array-like of `float`)
+            ICRS Right Ascension and Declination of each chunk of the
+            catalog, e.g. as read from successive row groups of a file.
+        degrees : `bool`, optional
+            Are the coordinates in degrees (otherwise radians)?
+
+        Yields
+        ------
+        result : `numpy.ndarray` of `dtype`
+            The assignment for each row of the chunk, in order; chunks
+            larger than ``chunkSize`` are processed in pieces, but yielded
+            whole.
+        """
+        for ra, dec in chunks:
+            yield self.assign(ra, dec, degrees=degrees)
+
+    def _assignChunk(self, ra, dec, degrees, out):
+        """Assign a tract and patch to one chunk of rows.
+
+        Parameters
+        ----------
+        ra, dec : `numpy.ndarray`
+            ICRS Right Ascension and Declination of the chunk.
+        degrees : `bool`
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+        out : `numpy.ndarray` of `dtype`
+            Array in which to write the assignments.
+        """
+        _assignRows(self.skyMap, ra, dec, degrees, out)
+
+
+class ParallelTractPatchAssigner(TractPatchAssigner):
+    """Assign a tract and patch to each row of a catalog using a pool of
+    worker processes.
+
+    Parameters
+    ----------
+    skyMap : `lsst.skymap.BaseSkyMap`
+        Sky map defining the tracts and patches.
+    chunkSize : `int`, optional
+        Number of rows processed by a worker in one task.
+    numWorkers : `int`, optional
+        Number of worker processes; if None use the number of CPUs.
+        If 1, or if `multiprocessing.shared_memory` is not available
+        (Python < 3.8), rows are assigned serially in this process.
+
+    Notes
+    -----
+    The catalog is processed in blocks of ``numWorkers*chunkSize`` rows, so
+    memory use is bounded whatever the size of the catalog. The coordinates
+    of each block are copied into shared memory, and the workers write their
+    assignments into a shared output array, which is copied into the
+    result; the rows are never pickled, as each task only carries the names
+    of the shared memory blocks and its range of rows. The shared memory is
+    reused for every block. The sky map is sent to each worker once,
+    when the pool is started; sky maps pickle as their configuration, so
+    this is cheap.
+
+    The pool is started on first use and kept until `close` is called;
+    the assigner may be used as a context manager to close it.
+    """
+
+    def __init__(self, skyMap, chunkSize=1 << 20, numWorkers=None):
+        super().__init__(skyMap, chunkSize=chunkSize)
+        if numWorkers is None:
+            numWorkers = os.cpu_count() or 1
+        if numWorkers < 1:
+            raise ValueError("numWorkers=%s; must be positive" % (numWorkers,))
+        self.numWorkers = int(numWorkers)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shut down the worker processes, if they have been started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def assign(self, ra, dec, degrees=False, out=None):
+        # Docstring inherited from TractPatchAssigner.assign
+        ra = numpy.asarray(ra).reshape(-1)
+        dec = numpy.asarray(dec).reshape(-1)
+        if self.numWorkers == 1 or shared_memory is None or len(ra) <= self.chunkSize:
+            return super().assign(ra, dec, degrees=degrees, out=out)
+        if len(ra) != len(dec):
+            raise ValueError("ra and dec have different lengths: %d vs %d" % (len(ra), len(dec)))
+        if out is None:
+            out = numpy.empty(len(ra), dtype=self.dtype)
+        elif out.shape != (len(ra),) or out.dtype != self.dtype:
+            raise ValueError("out must be a 1-d array of %d rows with dtype %s" % (len(ra), self.dtype))
+
+        numRows = len(ra)
+        blockRows = min(numRows, self.numWorkers*self.chunkSize)
+        coordMemory = shared_memory.SharedMemory(create=True, size=2*blockRows*numpy.dtype(float).itemsize)
+        try:
+            outMemory = shared_memory.SharedMemory(create=True, size=blockRows*self.dtype.itemsize)
+            try:
+                for start in range(0, numRows, blockRows):
+                    stop = min(start + blockRows, numRows)
+                    self._assignBlock(coordMemory, outMemory, blockRows, ra[start:stop], dec[start:stop],
+                                      degrees, out[start:stop])
+            finally:
+                outMemory.close()
+                outMemory.unlink()
+        finally:
+            coordMemory.close()
+            coordMemory.unlink()
+        return out
+
+    def _assignBlock(self, coordMemory, outMemory, blockRows, ra, dec, degrees, out):
+        """Assign a tract and patch to a block of rows using the workers.
+
+        Parameters
+        ----------
+        coordMemory, outMemory : `multiprocessing.shared_memory.SharedMemory`
+            Shared memory for the coordinates, as a (2, blockRows) array, and
+            for the assignments.
+        blockRows : `int`
+            Number of rows in the shared arrays.
+        ra, dec : `numpy.ndarray`
+            ICRS Right Ascension and Declination of the block; no more than
+            ``blockRows`` rows.
+        degrees : `bool`
+            Are ``ra`` and ``dec`` in degrees (otherwise radians)?
+        out : `numpy.ndarray` of `dtype`
+            Array in which to write the assignments.
+        """
+        numRows = len(ra)
+        coords = numpy.ndarray((2, blockRows), dtype=float, buffer=coordMemory.buf)
+        try:
+            coords[0, :numRows] = ra
+            coords[1, :numRows] = dec
+        finally:
+            # Release the buffer, so the shared memory can be closed
+            del coords
+        executor = self._getExecutor()
+        futures = [executor.submit(_assignShared, coordMemory.name, outMemory.name, blockRows,
+                                   start, min(start + self.chunkSize, numRows), degrees)
+                   for start in range(0, numRows, self.chunkSize)]
+        for future in futures:
+            future.result()
+        result = numpy.ndarray((blockRows,), dtype=self.dtype, buffer=outMemory.buf)
+        try:
+            out[:] = result[:numRows]
+        finally:
+            del result
+
+    def _getExecutor(self):
+        """Return the pool of worker processes, starting it if necessary."""
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.numWorkers, initializer=_initWorker, initargs=(self.skyMap,))
+        return self._executor
+
+
+def _assignRows(skyMap, ra, dec, degrees, out):
+    """Assign a tract and patch to rows, writing the results into ``out``.
+    """
+    tractId, patchX, patchY, patchIndex = skyMap.findTractPatchArray(ra, dec, degrees=degrees)
+    out["tract"] = tractId
+    out["patch_x"] = patchX
+    out["patch_y"] = patchY
+    out["patch"] = patchIndex
+
+
+# Sky map used by the tasks of a worker process of ParallelTractPatchAssigner
+_workerSkyMap = None
+
+
+def _initWorker(skyMap):
+    """Initialize a worker process of ParallelTractPatchAssigner."""
+    global _workerSkyMap
+    _workerSkyMap = skyMap
+
+
+def _assignShared(coordName, outName, numRows, start, stop, degrees):
+    """Assign a tract and patch to rows ``start:stop`` of the coordinates in
+    shared memory, writing the results into the shared output array.
+
+    Parameters
+    ----------
+    coordName : `str`
+        Name of the shared memory holding the coordinates, as a (2, numRows)
+        array of Right Ascension and Declination.
+    outName : `str`
+        Name of the shared memory holding the output array.
+    numRows : `int`
+        Number of rows in the shared arrays.
+    start, stop : `int`
+        Range of rows to assign.
+    degrees : `bool`
+        Are the coordinates in degrees (otherwise radians)?
+    """
+    coordMemory = shared_memory.SharedMemory(name=coordName)
+    outMemory = shared_memory.SharedMemory(name=outName)
+    try:
+        coords = numpy.ndarray((2, numRows), dtype=float, buffer=coordMemory.buf)
+        out = numpy.ndarray((numRows,), dtype=TractPatchAssigner.dtype, buffer=outMemory.buf)
+        try:
+            _assignRows(_workerSkyMap, coords[0, start:stop], coords[1, start:stop], degrees,
+                        out[start:stop])
+        finally:
+            # Release the buffers, so the shared memory can be closed
+            del coords, out
+    finally:
+        coordMemory.close()
+        outMemory.close()
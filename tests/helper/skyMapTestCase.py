@@ -19,15 +19,21 @@
 # the GNU General Public License along with this program.  If not,
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
+import collections
+import concurrent.futures
 import itertools
+import os
 import pickle
+import tempfile
+import time
 
 import numpy as np
 
 import lsst.geom as geom
 import lsst.utils.tests
 
-from lsst.skymap import skyMapRegistry
+from lsst.skymap import skyMapRegistry, BaseSkyMap
+from lsst.skymap.tractInfo import _includeSkyCoords
 
 
 def checkDm14809(testcase, skymap):
@@ -286,6 +292,42 @@ class SkyMapTestCase(lsst.utils.tests.TestCase):
                 foundIndexSet = set(patchInfo.getIndex() for patchInfo in patchInfoList)
                 self.assertEqual(foundIndexSet, predFoundIndexSet)
 
+    def testFindPatchRangeArray(self):
+        """Test that TractInfo.findPatchRangeArray agrees with findPatchList
+        """
+        skyMap = self.getSkyMap()
+        for tractId in np.random.choice(len(skyMap), 2):
+            tractInfo = skyMap[tractId]
+            wcs = tractInfo.getWcs()
+            numPatches = tractInfo.getNumPatches()
+            regionList = []
+            for patchInd in ((0, 0), (0, 1), (numPatches[0] - 1, numPatches[1] - 1)):
+                bbox = tractInfo.getPatchInfo(patchInd).getInnerBBox()
+                for grow in (-(tractInfo.getPatchBorder() + 1), 1, 5000):
+                    grownBBox = geom.Box2I(bbox)
+                    grownBBox.grow(grow)
+                    regionList.append(getCornerCoords(wcs=wcs, bbox=grownBBox))
+            ctrCoord = tractInfo.getCtrCoord()
+            regionList.append([])
+            regionList.append([ctrCoord])
+            regionList.append([geom.SpherePoint(ctrCoord.getLongitude() + 12*geom.hours,
+                                                -1*ctrCoord.getLatitude())])
+
+            ra = [coord.getRa().asDegrees() for region in regionList for coord in region]
+            dec = [coord.getDec().asDegrees() for region in regionList for coord in region]
+            offsets = np.cumsum([0] + [len(region) for region in regionList])
+            ranges = tractInfo.findPatchRangeArray(ra, dec, offsets, degrees=True)
+            for region, xMin, yMin, xMax, yMax in zip(regionList, *ranges):
+                expect = set(patchInfo.getIndex() for patchInfo in tractInfo.findPatchList(region))
+                if xMin < 0:
+                    self.assertEqual(expect, set())
+                    continue
+                got = set((x, y) for x in range(xMin, xMax + 1) for y in range(yMin, yMax + 1))
+                self.assertEqual(got, expect)
+
+            with self.assertRaises(ValueError):
+                tractInfo.findPatchRangeArray(ra, dec, offsets[:-1], degrees=True)
+
     def testFindTractPatchList(self):
         """Test findTractPatchList
 
@@ -302,6 +344,10 @@ class SkyMapTestCase(lsst.utils.tests.TestCase):
                 knownTractId=tractId,
             )
             self.assertClosestTractPatchList(skyMap, [tractInfo.getCtrCoord()], tractId)
+            # Each tract is listed once, however many coords it is closest to
+            tractPatchList = skyMap.findClosestTractPatchList([tractInfo.getCtrCoord()]*3)
+            self.assertEqual([(tract.getId(), patchList) for tract, patchList in tractPatchList],
+                             [(tractId, tractInfo.findPatchList([tractInfo.getCtrCoord()]))])
 
             vertices = tractInfo.getVertexList()
             if len(vertices) > 0:
@@ -318,6 +364,12 @@ class SkyMapTestCase(lsst.utils.tests.TestCase):
                     knownTractId=tractId,
                 )
 
+    def testFindTractNonFinite(self):
+        """Test that findTract raises LookupError for a non-finite coord"""
+        skyMap = self.getSkyMap()
+        with self.assertRaises(LookupError):
+            skyMap.findTract(geom.SpherePoint(np.nan, np.nan, geom.degrees))
+
     def testTractContains(self):
         """Test that TractInfo.contains works"""
         skyMap = self.getSkyMap()
@@ -327,6 +379,422 @@ class SkyMapTestCase(lsst.utils.tests.TestCase):
             opposite = geom.SpherePoint(coord.getLongitude() + 12*geom.hours, -1*coord.getLatitude())
             self.assertFalse(tract.contains(opposite))
 
+    def testTractContainsArray(self):
+        """Test that TractInfo.containsArray agrees with TractInfo.contains"""
+        skyMap = self.getSkyMap()
+        for tract in skyMap:
+            coord = tract.getCtrCoord()
+            opposite = geom.SpherePoint(coord.getLongitude() + 12*geom.hours, -1*coord.getLatitude())
+            coordList = [coord, opposite] + list(tract.getVertexList())
+            ra = [cc.getRa().asDegrees() for cc in coordList]
+            dec = [cc.getDec().asDegrees() for cc in coordList]
+            contains = tract.containsArray(ra, dec, degrees=True)
+            self.assertEqual(list(contains), [tract.contains(cc) for cc in coordList])
+            self.assertFalse(tract.containsArray(np.nan, 0.0)[0])
+
+    def testFindTractPatchArray(self):
+        """Test that the array lookups agree with findTract and findPatch"""
+        skyMap = self.getSkyMap()
+        coordList = [tractInfo.getCtrCoord() for tractInfo in skyMap]
+        ra = np.array([coord.getRa().asRadians() for coord in coordList])
+        dec = np.array([coord.getDec().asRadians() for coord in coordList])
+
+        tractId = skyMap.findTractIdArray(ra, dec)
+        self.assertEqual(list(tractId), [skyMap.findTract(coord).getId() for coord in coordList])
+        np.testing.assert_array_equal(skyMap.findTractIdArray(np.degrees(ra), np.degrees(dec), degrees=True),
+                                      tractId)
+        vectors = np.array([coord.getVector() for coord in coordList])
+        np.testing.assert_array_equal(skyMap.findTractIdArrayFromVectors(vectors), tractId)
+
+        tractId, patchX, patchY, patchIndex = skyMap.findTractPatchArray(ra, dec)
+        for coord, tid, px, py, pi in zip(coordList, tractId, patchX, patchY, patchIndex):
+            tractInfo = skyMap[int(tid)]
+            patchInfo = tractInfo.findPatch(coord)
+            self.assertEqual((px, py), patchInfo.getIndex())
+            self.assertEqual(pi, tractInfo.getSequentialPatchIndex(patchInfo))
+
+        # Unresolvable coordinates are flagged rather than raising
+        tractId, patchX, patchY, patchIndex = skyMap.findTractPatchArray([np.nan], [0.0])
+        self.assertEqual((tractId[0], patchX[0], patchY[0], patchIndex[0]), (-1, -1, -1, -1))
+
+    def testFindInnerArray(self):
+        """Test that findInnerArray agrees with findTract and findPatch"""
+        skyMap = self.getSkyMap()
+        for tractInfo in skyMap:
+            ctrCoord = tractInfo.getCtrCoord()
+            other = (tractInfo.getId() + 1) % len(skyMap)
+            patchIndex = tractInfo.getSequentialPatchIndex(tractInfo.findPatch(ctrCoord))
+            ra = [ctrCoord.getRa().asDegrees()]*4
+            dec = [ctrCoord.getDec().asDegrees()]*4
+            tract = [tractInfo.getId(), tractInfo.getId(), other, -1]
+            patch = [patchIndex, patchIndex + 1, patchIndex, patchIndex]
+            isTractInner, isPatchInner = skyMap.findInnerArray(ra, dec, tract, patch, degrees=True)
+            expectTract = [skyMap.findTract(ctrCoord).getId() == tid for tid in tract]
+            self.assertEqual(list(isTractInner), expectTract)
+            self.assertTrue(isPatchInner[0])
+            self.assertFalse(isPatchInner[1])
+            self.assertFalse(isPatchInner[3])
+            try:
+                otherTract = skyMap[other]
+                expectOther = otherTract.getSequentialPatchIndex(otherTract.findPatch(ctrCoord)) == patchIndex
+            except LookupError:
+                expectOther = False
+            self.assertEqual(isPatchInner[2], expectOther)
+
+        # Tract IDs that are not in the sky map are not inner
+        ctrCoord = skyMap[0].getCtrCoord()
+        isTractInner, isPatchInner = skyMap.findInnerArray([ctrCoord.getRa().asDegrees()]*2,
+                                                           [ctrCoord.getDec().asDegrees()]*2,
+                                                           [len(skyMap), len(skyMap) + 10], [0, 0],
+                                                           degrees=True)
+        self.assertFalse(np.any(isTractInner))
+        self.assertFalse(np.any(isPatchInner))
+
+        with self.assertRaises(ValueError):
+            skyMap.findInnerArray([0.0], [0.0], [0, 0], [0])
+
+    def testFindPatchArray(self):
+        """Test that TractInfo.findPatchArray agrees with per-coord WCS
+        transforms
+        """
+        skyMap = self.getSkyMap()
+        for tractId in np.random.choice(len(skyMap), 2):
+            tractInfo = skyMap[tractId]
+            wcs = tractInfo.getWcs()
+            bbox = geom.Box2D(tractInfo.getBBox())
+            bbox.grow(1000)
+            pixelList = [geom.Point2D(x, y) for x, y in
+                         zip(np.random.uniform(bbox.getMinX(), bbox.getMaxX(), size=50),
+                             np.random.uniform(bbox.getMinY(), bbox.getMaxY(), size=50))]
+            coordList = wcs.pixelToSky(pixelList)
+            ra = np.array([coord.getRa().asRadians() for coord in coordList])
+            dec = np.array([coord.getDec().asRadians() for coord in coordList])
+            patchX, patchY, patchIndex = tractInfo.findPatchArray(ra, dec)
+            innerDims = tractInfo.getPatchInnerDimensions()
+            for coord, px, py, pi in zip(coordList, patchX, patchY, patchIndex):
+                pixelInd = geom.Point2I(wcs.skyToPixel(coord))
+                if tractInfo.getBBox().contains(pixelInd):
+                    expect = (pixelInd.getX()//innerDims[0], pixelInd.getY()//innerDims[1])
+                    self.assertEqual((px, py), expect)
+                    self.assertEqual(pi, expect[1]*tractInfo.getNumPatches()[0] + expect[0])
+                    self.assertEqual(tractInfo.findPatch(coord).getIndex(), expect)
+                else:
+                    self.assertEqual((px, py, pi), (-1, -1, -1))
+                    self.assertRaises(LookupError, tractInfo.findPatch, coord)
+
+    def testTractCenterIndex(self):
+        """Test that the tract center index finds the nearest tract center"""
+        skyMap = self.getSkyMap()
+        ra = np.random.uniform(0.0, 360.0, size=20)
+        dec = np.degrees(np.arcsin(np.random.uniform(-1.0, 1.0, size=20)))
+        coordList = [geom.SpherePoint(r, d, geom.degrees) for r, d in zip(ra, dec)]
+        # include tract centers, to exercise ties
+        coordList += [tractInfo.getCtrCoord() for tractInfo in skyMap]
+        vectors = np.array([coord.getVector() for coord in coordList])
+        found = skyMap._getTractCenterIndex().query(vectors)
+        for coord, index in zip(coordList, found):
+            distList = sorted((coord.separation(tractInfo.getCtrCoord()).asDegrees(), i) for
+                              i, tractInfo in enumerate(skyMap))
+            self.assertAlmostEqual(distList[0][0],
+                                   coord.separation(skyMap[int(index)].getCtrCoord()).asDegrees())
+
+        unpickled = pickle.loads(pickle.dumps(skyMap))
+        self.assertIsNone(unpickled._tractCenterIndex)
+        np.testing.assert_array_equal(unpickled._getTractCenterIndex().query(vectors), found)
+
+    def testTractBoundingCap(self):
+        """Test that tract bounding caps contain their tracts, and that
+        BaseSkyMap.findTractPatchList finds the same tracts as searching
+        every tract
+        """
+        skyMap = self.getSkyMap()
+        for tractInfo in skyMap:
+            center, radius = tractInfo._getBoundingCap()
+            ctrCoord = tractInfo.getCtrCoord()
+            bbox = geom.Box2D(tractInfo.getBBox())
+            for coord in tractInfo.getWcs().pixelToSky(bbox.getCorners()) + list(tractInfo.getVertexList()):
+                self.assertLessEqual(coord.separation(ctrCoord).asRadians(), radius)
+            opposite = geom.SpherePoint(ctrCoord.getLongitude() + 12*geom.hours, -1*ctrCoord.getLatitude())
+            self.assertEqual(tractInfo.findPatchList([opposite]), ())
+
+        for tractId in np.random.choice(len(skyMap), 2):
+            tractInfo = skyMap[tractId]
+            coordList = tractInfo.getWcs().pixelToSky(geom.Box2D(tractInfo.getBBox()).getCorners())
+            expect = [(tt, tt.findPatchList(coordList)) for tt in skyMap]
+            expect = [(tt, patchList) for tt, patchList in expect if patchList]
+            # Call the base implementation, as some sky maps override it
+            self.assertEqual(BaseSkyMap.findTractPatchList(skyMap, coordList), expect)
+
+    def testTractCache(self):
+        """Test the bounded tract cache of CachingSkyMap"""
+        skyMap = self.getSkyMap()
+        if not hasattr(skyMap, "configureTractCache"):
+            self.skipTest("This skymap doesn't cache tracts")
+        # Default: every tract is cached
+        for tractInfo in skyMap:
+            self.assertIs(skyMap[tractInfo.getId()], tractInfo)
+        stats = skyMap.getTractCacheStats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (len(skyMap), len(skyMap), 0))
+        self.assertEqual((stats.size, stats.maxSize), (len(skyMap), None))
+
+        skyMap.configureTractCache(maxSize=2)
+        self.assertEqual(skyMap.getTractCacheStats().size, 0)
+        tract0 = skyMap[0]
+        tract1 = skyMap[1]
+        self.assertIs(skyMap[0], tract0)  # 0 is now the most recently used
+        tract2 = skyMap[2]  # evicts 1
+        self.assertIs(skyMap[0], tract0)
+        self.assertIs(skyMap[2], tract2)
+        self.assertIsNot(skyMap[1], tract1)  # regenerated, evicting 0
+        self.assertEqual(skyMap[1].getCtrCoord(), tract1.getCtrCoord())
+        stats = skyMap.getTractCacheStats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions), (4, 4, 2))
+        self.assertEqual((stats.size, stats.maxSize), (2, 2))
+        self.assertEqual(len(list(skyMap)), len(skyMap))
+        self.assertEqual(skyMap.getTractCacheStats().size, 2)
+
+        with self.assertRaises(IndexError):
+            skyMap[len(skyMap)]
+        with self.assertRaises(ValueError):
+            skyMap.configureTractCache(maxSize=0)
+
+        # Sparse cache
+        skyMap.configureTractCache(sparse=True)
+        tract1 = skyMap[1]
+        self.assertIs(skyMap[1], tract1)
+        self.assertEqual(skyMap.getTractCacheStats().size, 1)
+
+        # Iteration without caching uses, but does not add to, the cache
+        skyMap.configureTractCache(cacheIteration=False)
+        tract1 = skyMap[1]
+        tractList = list(skyMap)
+        self.assertEqual(len(tractList), len(skyMap))
+        self.assertIs(tractList[1], tract1)
+        self.assertEqual([tractInfo.getId() for tractInfo in tractList], list(range(len(skyMap))))
+        self.assertEqual(skyMap.getTractCacheStats().size, 1)
+        self.assertEqual(len(list(skyMap.iterTracts(cache=True))), len(skyMap))
+        self.assertEqual(skyMap.getTractCacheStats().size, len(skyMap))
+
+    def testConcurrentTractGeneration(self):
+        """Test that each tract is generated once when requested from several
+        threads at once
+        """
+        skyMap = self.getSkyMap()
+        if not hasattr(skyMap, "configureTractCache"):
+            self.skipTest("This skymap doesn't cache tracts")
+        generateTract = skyMap.generateTract
+        calls = collections.Counter()
+
+        def slowGenerateTract(index):
+            calls[index] += 1
+            time.sleep(0.01)
+            return generateTract(index)
+
+        skyMap.generateTract = slowGenerateTract
+        indices = [0, 1, 2]*8
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            tractList = list(executor.map(skyMap.__getitem__, indices))
+        self.assertEqual(calls, {0: 1, 1: 1, 2: 1})
+        for index, tractInfo in zip(indices, tractList):
+            self.assertIs(tractInfo, skyMap[index])
+        self.assertEqual(skyMap._tractLocks, {})
+
+    def testWarm(self):
+        """Test that warming and prefetching cache the same tracts as
+        serial generation
+        """
+        skyMap = self.getSkyMap()
+        if not hasattr(skyMap, "warm"):
+            self.skipTest("This skymap doesn't cache tracts")
+        serialSkyMap = self.getSkyMap()
+        patchBorder = skyMap.config.patchBorder
+        indices = [0, 1, 2]
+
+        skyMap.warm(indices, workers=2)
+        self.assertEqual(skyMap.getTractCacheStats().size, len(indices))
+        for index in indices:
+            self.assertUnpickledTractInfo(skyMap[index], serialSkyMap[index], patchBorder)
+
+        skyMap = self.getSkyMap()
+        skyMap.warm(indices + [1], workers=2, useProcesses=True)
+        self.assertEqual(skyMap.getTractCacheStats().size, len(indices))
+        for index in indices:
+            self.assertUnpickledTractInfo(skyMap[index], serialSkyMap[index], patchBorder)
+        with self.assertRaises(IndexError):
+            skyMap.warm([len(skyMap)])
+
+        skyMap = self.getSkyMap()
+        tractList = list(skyMap.iterTracts(prefetch=3))
+        self.assertEqual([tractInfo.getId() for tractInfo in tractList], list(range(len(skyMap))))
+        for tractInfo in tractList:
+            self.assertIs(skyMap[tractInfo.getId()], tractInfo)
+
+    def testDiskCache(self):
+        """Test that tracts are read from the disk cache when available, and
+        regenerated when the cache is missing or stale
+        """
+        skyMap = self.getSkyMap()
+        if not hasattr(skyMap, "configureDiskCache"):
+            self.skipTest("This skymap doesn't cache tracts")
+        patchBorder = skyMap.config.patchBorder
+        with tempfile.TemporaryDirectory() as directory:
+            skyMap.configureDiskCache(directory)
+            tractInfo = skyMap[0]
+            path = os.path.join(directory, skyMap._getDiskCacheKey(), "0.pickle")
+            self.assertTrue(os.path.exists(path))
+
+            def noGenerate(index):
+                raise AssertionError("Tract %d generated rather than read from the disk cache" % (index,))
+
+            cachedSkyMap = self.getSkyMap()
+            cachedSkyMap.configureDiskCache(directory)
+            cachedSkyMap.generateTract = noGenerate
+            self.assertUnpickledTractInfo(cachedSkyMap[0], tractInfo, patchBorder)
+            with self.assertRaises(AssertionError):
+                cachedSkyMap[1]
+
+            # A corrupt file is replaced
+            with open(path, "wb") as outfile:
+                outfile.write(b"not a pickle")
+            skyMap = self.getSkyMap()
+            skyMap.configureDiskCache(directory)
+            self.assertUnpickledTractInfo(skyMap[0], tractInfo, patchBorder)
+            cachedSkyMap.configureTractCache()
+            self.assertUnpickledTractInfo(cachedSkyMap[0], tractInfo, patchBorder)
+
+            # The disk cache configuration is not pickled
+            self.assertIsNone(pickle.loads(pickle.dumps(skyMap))._diskCacheDir)
+
+    def testLazyTractGeometry(self):
+        """Test that the tract geometry is computed on first use, exactly
+        once, and is pickled
+        """
+        skyMap = self.getSkyMap()
+        patchBorder = skyMap.config.patchBorder
+        tractInfo = skyMap[0]
+        tractInfo.getId()
+        tractInfo.getCtrCoord()
+        self.assertIsNone(tractInfo._wcs)
+
+        computed = []
+        computeGeometry = tractInfo._computeGeometry
+
+        def slowComputeGeometry(wcs):
+            computed.append(wcs)
+            time.sleep(0.01)
+            return computeGeometry(wcs)
+
+        tractInfo._computeGeometry = slowComputeGeometry
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            bboxList = list(executor.map(lambda _: tractInfo.getBBox(), range(8)))
+        self.assertEqual(len(computed), 1)
+        for bbox in bboxList:
+            self.assertEqual(bbox, bboxList[0])
+
+        lazyTractInfo = self.getSkyMap()[0]
+        unpickled = pickle.loads(pickle.dumps(lazyTractInfo))
+        self.assertIsNotNone(unpickled._wcs)
+        self.assertUnpickledTractInfo(unpickled, tractInfo, patchBorder)
+        self.assertUnpickledTractInfo(lazyTractInfo, tractInfo, patchBorder)
+
+    def testUnpickleOldTractInfo(self):
+        """Test that the state of a TractInfo pickled before the cached
+        attributes were added can be restored
+        """
+        skyMap = self.getSkyMap()
+        tractInfo = skyMap[0]
+        state = tractInfo.__getstate__()
+        for name in ("_initialWcs", "_boundingCap", "_patchCache", "_innerSkyPolygon", "_outerSkyPolygon",
+                     "_patchPolygonCache"):
+            del state[name]
+        unpickled = type(tractInfo).__new__(type(tractInfo))
+        unpickled.__setstate__(state)
+        self.assertUnpickledTractInfo(unpickled, tractInfo, skyMap.config.patchBorder)
+        coord = tractInfo.getCtrCoord()
+        self.assertTrue(unpickled.contains(coord))
+        self.assertEqual(unpickled.findPatch(coord), tractInfo.findPatch(coord))
+        self.assertEqual(unpickled.findPatchList([coord]), tractInfo.findPatchList([coord]))
+        self.assertEqual(unpickled.getOuterSkyPolygon(), tractInfo.getOuterSkyPolygon())
+
+    def testIncludeSkyCoords(self):
+        """Test that bounding boxes computed with one WCS transform are
+        identical to those computed point by point
+        """
+        skyMap = self.getSkyMap()
+        for index in range(min(3, len(skyMap))):
+            tractInfo = skyMap[index]
+            wcs = tractInfo.getWcs()
+            coordList = [tractInfo.getCtrCoord()] + list(tractInfo.getVertexList())
+            coordList += [coord.offset(45*geom.degrees, 0.1*geom.degrees) for coord in coordList]
+            expect = geom.Box2D()
+            for coord in coordList:
+                expect.include(wcs.skyToPixel(coord))
+            bbox = geom.Box2D()
+            _includeSkyCoords(bbox, coordList, wcs)
+            self.assertEqual(bbox.getMin(), expect.getMin())
+            self.assertEqual(bbox.getMax(), expect.getMax())
+
+    def testPatchInfoCache(self):
+        """Test that PatchInfo instances are shared, hashable and immutable
+        """
+        skyMap = self.getSkyMap()
+        tractInfo = skyMap[0]
+        patchInfo = tractInfo[0]
+        self.assertIs(tractInfo.getPatchInfo((0, 0)), patchInfo)
+        self.assertIs(next(iter(tractInfo)), patchInfo)
+        self.assertEqual(patchInfo.getIndex(), (0, 0))
+        self.assertEqual(len(set(tractInfo)), len(tractInfo))
+        self.assertEqual(hash(patchInfo), hash(pickle.loads(pickle.dumps(patchInfo))))
+        self.assertEqual(pickle.loads(pickle.dumps(patchInfo)), patchInfo)
+
+        innerBBox = patchInfo.getInnerBBox()
+        innerBBox.grow(1)
+        self.assertNotEqual(patchInfo.getInnerBBox(), innerBBox)
+        self.assertEqual(tractInfo[0].getInnerBBox(), patchInfo.getInnerBBox())
+        outerBBox = patchInfo.getOuterBBox()
+        outerBBox.grow(1)
+        self.assertNotEqual(patchInfo.getOuterBBox(), outerBBox)
+        self.assertEqual(tractInfo[0], patchInfo)
+        self.assertNotEqual(patchInfo, None)
+        self.assertFalse(patchInfo == patchInfo.getIndex())
+        with self.assertRaises(AttributeError):
+            patchInfo.extra = None
+
+        # The cache of patches is not pickled
+        unpickled = pickle.loads(pickle.dumps(tractInfo))
+        self.assertIsNone(unpickled._patchCache)
+        self.assertEqual(unpickled[0], patchInfo)
+
+    def testPatchBBoxArrays(self):
+        """Test that the patch bounding box arrays and index conversions
+        agree with the PatchInfo of each patch
+        """
+        skyMap = self.getSkyMap()
+        for index in range(min(3, len(skyMap))):
+            tractInfo = skyMap[index]
+            innerBBoxes, outerBBoxes = tractInfo.getPatchBBoxArrays()
+            self.assertEqual(innerBBoxes.shape, (len(tractInfo), 4))
+            self.assertEqual(outerBBoxes.shape, (len(tractInfo), 4))
+            for patchInfo in tractInfo:
+                sequentialIndex = tractInfo.getSequentialPatchIndex(patchInfo)
+                patchIndex = tractInfo.getPatchIndexPair(sequentialIndex)
+                self.assertEqual(patchIndex, patchInfo.getIndex())
+                self.assertIsInstance(patchIndex[1], int)
+                for bbox, row in ((patchInfo.getInnerBBox(), innerBBoxes[sequentialIndex]),
+                                  (patchInfo.getOuterBBox(), outerBBoxes[sequentialIndex])):
+                    self.assertEqual(tuple(row), (bbox.getMinX(), bbox.getMinY(),
+                                                  bbox.getMaxX(), bbox.getMaxY()))
+
+            nx, ny = tractInfo.getNumPatches()
+            sequentialIndex = np.arange(-1, nx*ny + 1)
+            patchX, patchY = tractInfo.getPatchIndexPairArray(sequentialIndex)
+            np.testing.assert_array_equal(patchX[1:-1], np.tile(np.arange(nx), ny))
+            np.testing.assert_array_equal(patchY[1:-1], np.repeat(np.arange(ny), nx))
+            self.assertEqual((patchX[0], patchY[0], patchX[-1], patchY[-1]), (-1, -1, -1, -1))
+            patchX[0] = nx
+            np.testing.assert_array_equal(tractInfo.getSequentialPatchIndexArray(patchX, patchY),
+                                          np.concatenate(([-1], sequentialIndex[1:-1], [-1])))
+
     def testTractInfoGetPolygon(self):
         skyMap = self.getSkyMap()
         for tractInfo in skyMap:
@@ -359,6 +827,32 @@ class SkyMapTestCase(lsst.utils.tests.TestCase):
                     self.assertBBoxPolygonOk(polygon=patchInfo.getOuterSkyPolygon(tractWcs=wcs),
                                              bbox=patchInfo.getOuterBBox(), wcs=wcs)
 
+    def testSkyPolygonCache(self):
+        """Test that tract and patch sky polygons are cached"""
+        skyMap = self.getSkyMap()
+        tractInfo = skyMap[0]
+        wcs = tractInfo.getWcs()
+        self.assertIs(tractInfo.getInnerSkyPolygon(), tractInfo.getInnerSkyPolygon())
+        self.assertIs(tractInfo.getOuterSkyPolygon(), tractInfo.getOuterSkyPolygon())
+        for patchInfo in list(tractInfo)[:3]:
+            index = patchInfo.getIndex()
+            inner = tractInfo.getPatchInnerSkyPolygon(index)
+            outer = tractInfo.getPatchOuterSkyPolygon(tractInfo.getSequentialPatchIndex(patchInfo))
+            self.assertEqual(inner, patchInfo.getInnerSkyPolygon(wcs))
+            self.assertEqual(outer, patchInfo.getOuterSkyPolygon(wcs))
+            self.assertIs(tractInfo.getPatchInnerSkyPolygon(index), inner)
+            self.assertIs(tractInfo.getPatchOuterSkyPolygon(index), outer)
+
+        # The patch polygon cache is bounded
+        for patchInfo in tractInfo:
+            tractInfo.getPatchOuterSkyPolygon(patchInfo.getIndex())
+        stats = tractInfo._patchPolygonCache.getStats()
+        self.assertLessEqual(stats.size, stats.maxSize)
+
+        unpickled = pickle.loads(pickle.dumps(tractInfo))
+        self.assertIsNone(unpickled._patchPolygonCache)
+        self.assertEqual(unpickled.getOuterSkyPolygon(), tractInfo.getOuterSkyPolygon())
+
     def testDm14809(self):
         """Generic version of test that DM-14809 has been fixed"""
         checkDm14809(self, self.getSkyMap())
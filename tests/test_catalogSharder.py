@@ -0,0 +1,182 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+"""Test catalog sharding by tract and patch
+"""
+import collections
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+try:
+    from astropy.table import Table
+except ImportError:
+    Table = None
+
+import lsst.utils.tests
+
+from lsst.skymap import TractPatchAssigner
+from lsst.skymap.catalogSharder import shardCatalog, main
+from lsst.skymap.ringsSkyMap import RingsSkyMap
+
+
+class CatalogSharderTestCase(lsst.utils.tests.TestCase):
+
+    def setUp(self):
+        np.random.seed(47)
+        config = RingsSkyMap.ConfigClass()
+        config.numRings = 3
+        self.skyMap = RingsSkyMap(config)
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempDir.cleanup)
+
+        self.ra = np.random.uniform(0.0, 360.0, size=200)
+        self.dec = np.degrees(np.arcsin(np.random.uniform(-1.0, 1.0, size=200)))
+        self.inputPaths = []
+        for i, rows in enumerate((range(0, 120), range(120, 200))):
+            path = os.path.join(self.tempDir.name, "input%d.csv" % (i,))
+            with open(path, "w", newline="") as stream:
+                writer = csv.writer(stream)
+                writer.writerow(["id", "ra", "dec"])
+                writer.writerows((row, repr(float(self.ra[row])), repr(float(self.dec[row])))
+                                 for row in rows)
+            self.inputPaths.append(path)
+        self.assignment = TractPatchAssigner(self.skyMap).assign(self.ra, self.dec, degrees=True)
+
+    def checkOutputs(self, outputDir, manifest, outputFormat="csv", columnNames=("id", "ra", "dec")):
+        """Check the outputs and manifest against the assignment."""
+        with open(os.path.join(outputDir, "manifest.json")) as stream:
+            self.assertEqual(json.load(stream), manifest)
+        assigned = self.assignment["patch"] >= 0
+        self.assertEqual(manifest["numRows"], len(self.ra))
+        self.assertEqual(manifest["numUnassigned"], np.sum(~assigned))
+        expect = collections.Counter(zip(self.assignment["tract"][assigned].tolist(),
+                                         self.assignment["patch"][assigned].tolist()))
+        self.assertEqual({(entry["tract"], entry["patch"]): entry["rows"] for entry in manifest["patches"]},
+                         expect)
+        for entry in manifest["patches"]:
+            path = os.path.join(outputDir, entry["path"])
+            if outputFormat == "parquet":
+                table = pyarrow.parquet.read_table(path).to_pydict()
+                names = list(table)
+                rows = list(zip(*table.values()))
+            else:
+                with open(path, newline="") as stream:
+                    rows = list(csv.reader(stream))
+                names = rows.pop(0)
+            self.assertEqual(names, list(columnNames))
+            self.assertEqual(len(rows), entry["rows"])
+            for row in rows:
+                self.assertEqual(tuple(self.assignment[int(row[0])]),
+                                 (entry["tract"], entry["patch_x"], entry["patch_y"], entry["patch"]))
+                self.assertEqual(float(row[1]), self.ra[int(row[0])])
+
+    def testShardCatalog(self):
+        """Test sharding with small chunks, few open files and a small memory
+        budget, so that outputs are closed and reopened
+        """
+        outputDir = os.path.join(self.tempDir.name, "output")
+        manifest = shardCatalog(self.inputPaths, outputDir, self.skyMap, chunkSize=17, maxOpenFiles=2,
+                                memoryBudget=1000)
+        self.checkOutputs(outputDir, manifest)
+
+        # Outputs of an earlier run are not overwritten
+        with self.assertRaises(FileExistsError):
+            shardCatalog(self.inputPaths, outputDir, self.skyMap)
+        with self.assertRaises(ValueError):
+            shardCatalog(self.inputPaths, os.path.join(self.tempDir.name, "columns"), self.skyMap,
+                         raColumn="coord_ra")
+        with self.assertRaises(ValueError):
+            shardCatalog(self.inputPaths, os.path.join(self.tempDir.name, "format"), self.skyMap,
+                         outputFormat="hdf5")
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not available")
+    def testParquetOutput(self):
+        """Test sharding into Parquet files, with outputs reopened so that
+        patches have several parts
+        """
+        outputDir = os.path.join(self.tempDir.name, "output")
+        manifest = shardCatalog(self.inputPaths, outputDir, self.skyMap, outputFormat="parquet",
+                                chunkSize=17, maxOpenFiles=2, memoryBudget=1000)
+        self.checkOutputs(outputDir, manifest, outputFormat="parquet")
+
+    @unittest.skipIf(Table is None, "astropy is not available")
+    def testFitsInput(self):
+        """Test sharding FITS files, whose columns are big-endian and whose
+        strings are bytes
+        """
+        names = np.array(["src%d" % (row,) for row in range(len(self.ra))])
+        fitsPaths = []
+        for i, rows in enumerate((slice(0, 120), slice(120, 200))):
+            path = os.path.join(self.tempDir.name, "input%d.fits" % (i,))
+            Table({"id": np.arange(len(self.ra))[rows], "ra": self.ra[rows], "dec": self.dec[rows],
+                   "name": names[rows]}).write(path, format="fits")
+            fitsPaths.append(path)
+        columnNames = ("id", "ra", "dec", "name")
+
+        outputDir = os.path.join(self.tempDir.name, "csv")
+        manifest = shardCatalog(fitsPaths, outputDir, self.skyMap, chunkSize=17)
+        self.checkOutputs(outputDir, manifest, columnNames=columnNames)
+        for entry in manifest["patches"]:
+            with open(os.path.join(outputDir, entry["path"]), newline="") as stream:
+                for row in list(csv.reader(stream))[1:]:
+                    self.assertEqual(row[3], names[int(row[0])])
+
+        if pyarrow is not None:
+            outputDir = os.path.join(self.tempDir.name, "parquet")
+            manifest = shardCatalog(fitsPaths, outputDir, self.skyMap, outputFormat="parquet",
+                                    chunkSize=17)
+            self.checkOutputs(outputDir, manifest, outputFormat="parquet", columnNames=columnNames)
+
+    def testMain(self):
+        """Test the command-line interface"""
+        configPath = os.path.join(self.tempDir.name, "config.py")
+        with open(configPath, "w") as stream:
+            stream.write("config.numRings = 3\n")
+        outputDir = os.path.join(self.tempDir.name, "output")
+        main([outputDir] + self.inputPaths + ["--skymap", "rings", "--config", configPath,
+                                              "--chunk-size", "50"])
+        with open(os.path.join(outputDir, "manifest.json")) as stream:
+            manifest = json.load(stream)
+        self.assertEqual(manifest["skyMap"]["sha1"], self.skyMap.getSha1().hex())
+        self.checkOutputs(outputDir, manifest)
+
+
+class MemoryTester(lsst.utils.tests.MemoryTestCase):
+    pass
+
+
+def setup_module(module):
+    lsst.utils.tests.init()
+
+
+if __name__ == "__main__":
+    lsst.utils.tests.init()
+    unittest.main()
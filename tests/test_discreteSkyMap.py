@@ -1,5 +1,8 @@
 import unittest
 
+import numpy as np
+
+import lsst.geom as geom
 import lsst.utils.tests
 
 from lsst.skymap.discreteSkyMap import DiscreteSkyMap
@@ -65,6 +68,34 @@ class DiscreteTestCase(skyMapTestCase.SkyMapTestCase):
             skyMap = self.getSkyMap(config=config)
             self.assertNotEqual(skyMap, defaultSkyMap)
 
+    def testFindAllTracts(self):
+        """Test that the tract index finds all and nearest tracts"""
+        config = self.getConfig()
+        # add overlapping tracts
+        config.raList.extend([11.5, 12.0])
+        config.decList.extend([41.0, 42.0])
+        config.radiusList.extend([1.0, 3.0])
+        skyMap = self.getSkyMap(config=config)
+        coordList = []
+        for tractInfo in skyMap:
+            ctrCoord = tractInfo.getCtrCoord()
+            for bearing in (0, 45, 90, 135, 180, 225, 270, 315):
+                for offset in (0.0, 1.0, 2.5, 3.5):
+                    coordList.append(ctrCoord.offset(bearing*geom.degrees, offset*geom.degrees))
+        ra = np.array([coord.getRa().asDegrees() for coord in coordList])
+        dec = np.array([coord.getDec().asDegrees() for coord in coordList])
+
+        allTractIds = skyMap.findAllTractIdArray(ra, dec, degrees=True)
+        nearestTractIds = skyMap.findTractIdArray(ra, dec, degrees=True)
+        for coord, row, nearest in zip(coordList, allTractIds, nearestTractIds):
+            expect = [tractInfo.getId() for tractInfo in skyMap if tractInfo.contains(coord)]
+            self.assertEqual([tractId for tractId in row if tractId >= 0], expect)
+            self.assertEqual([tractInfo.getId() for tractInfo in skyMap.findAllTracts(coord)], expect)
+            distList = sorted((coord.separation(tractInfo.getCtrCoord()).asDegrees(), tractInfo.getId())
+                              for tractInfo in skyMap)
+            self.assertEqual(nearest, distList[0][1])
+        self.assertGreater(allTractIds.shape[1], 1)
+
 
 class MemoryTester(lsst.utils.tests.MemoryTestCase):
     pass
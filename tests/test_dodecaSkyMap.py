@@ -58,6 +58,17 @@ class DodecaSkyMapTestCase(skyMapTestCase.SkyMapTestCase):
         skyMap = self.getSkyMap(config=config)
         self.assertNotEqual(skyMap, defaultSkyMap)
 
+    def testFindTractIdArray(self):
+        """Test that the vectorized face lookup agrees with the scalar one"""
+        for withTractsOnPoles in (False, True):
+            config = self.getConfig()
+            config.withTractsOnPoles = withTractsOnPoles
+            skyMap = self.getSkyMap(config=config)
+            vectors = numpy.random.normal(size=(100, 3))
+            tractId = skyMap.findTractIdArrayFromVectors(vectors)
+            for vector, tid in zip(vectors, tractId):
+                self.assertEqual(tid, skyMap._dodecahedron.getFaceInd(vector))
+
     def testFindTract(self):
         """Test findTract and tractInfo.findPatch
         """
@@ -196,6 +196,34 @@ class EquatSkyMapTestCase(skyMapTestCase.SkyMapTestCase):
                     testCoord = wcs.pixelToSky(outerPixPos)
                     self.assertRaises(LookupError, tractInfo.findPatch, testCoord)
 
+    def testFindTractOutsideDecRange(self):
+        """Test that coords outside decRange are reported as such"""
+        skyMap = self.getSkyMap()
+        decRange = skyMap.config.decRange
+        ra = numpy.array([10.0, 100.0, 200.0, 300.0, 359.999])
+        for dec in (decRange[0] - 0.01, decRange[1] + 0.01, -89.0, 89.0):
+            tractId = skyMap.findTractIdArray(ra, numpy.full(len(ra), dec), degrees=True)
+            numpy.testing.assert_array_equal(tractId, -1)
+            with self.assertRaises(LookupError):
+                skyMap.findTract(geom.SpherePoint(ra[0], dec, geom.degrees))
+        tractId = skyMap.findTractIdArray(ra, numpy.zeros(len(ra)), degrees=True)
+        numpy.testing.assert_array_equal(tractId, (ra//(360.0/len(skyMap))).astype(int))
+
+    def testFindClosestTractPatchListOutsideDecRange(self):
+        """Test that findClosestTractPatchList finds the tract nearest in RA
+        for coords outside decRange, and does not raise
+        """
+        skyMap = self.getSkyMap()
+        decRange = skyMap.config.decRange
+        inside = geom.SpherePoint(10.0, decRange[1] - 0.01, geom.degrees)
+        outside = geom.SpherePoint(10.0, decRange[1] + 0.01, geom.degrees)
+        tractId = skyMap.findTract(inside).getId()
+        for coordList in ([inside, outside], [outside]):
+            tractPatchList = skyMap.findClosestTractPatchList(coordList)
+            self.assertEqual([tractInfo.getId() for tractInfo, patchList in tractPatchList], [tractId])
+            self.assertGreater(len(tractPatchList[0][1]), 0)
+        self.assertEqual(skyMap.findClosestTractPatchList([]), [])
+
 
 class MemoryTester(lsst.utils.tests.MemoryTestCase):
     pass
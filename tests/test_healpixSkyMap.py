@@ -1,4 +1,7 @@
 import unittest
+
+import numpy as np
+
 import lsst.geom as geom
 import lsst.utils.tests
 from helper import skyMapTestCase
@@ -8,7 +11,8 @@ try:
 except Exception:
     healpy = None
 
-from lsst.skymap.healpixSkyMap import HealpixSkyMap
+from lsst.skymap.healpixSkyMap import HealpixSkyMap, coordToAng
+from lsst.skymap.detail import DictCache
 
 
 class HealpixTestCase(skyMapTestCase.SkyMapTestCase):
@@ -42,6 +46,30 @@ class HealpixTestCase(skyMapTestCase.SkyMapTestCase):
             skyMap = self.getSkyMap(config=config)
             self.assertNotEqual(skyMap, defaultSkyMap)
 
+    def testFindTractIdArray(self):
+        """Test that the vectorized lookup agrees with healpy for each coord"""
+        ra = np.random.uniform(0.0, 360.0, size=100)
+        dec = np.degrees(np.arcsin(np.random.uniform(-1.0, 1.0, size=100)))
+        for nest in (False, True):
+            config = self.getConfig()
+            config.log2NSide = 3
+            config.nest = nest
+            skyMap = self.getSkyMap(config=config)
+            tractId = skyMap.findTractIdArray(ra, dec, degrees=True)
+            for r, d, tid in zip(ra, dec, tractId):
+                theta, phi = coordToAng(geom.SpherePoint(r, d, geom.degrees))
+                self.assertEqual(tid, healpy.ang2pix(2**config.log2NSide, theta, phi, nest=nest))
+
+    def testSparseCache(self):
+        """Test that a map with very many tracts uses a sparse cache"""
+        config = self.getConfig()
+        config.log2NSide = 9
+        skyMap = self.getSkyMap(config=config)
+        self.assertIsInstance(skyMap._tractCache, DictCache)
+        tract = skyMap[len(skyMap) - 1]
+        self.assertIs(skyMap[len(skyMap) - 1], tract)
+        self.assertEqual(skyMap.getTractCacheStats().size, 1)
+
     def tearDown(self):
         if hasattr(self, "config"):
             del self.config
@@ -1,5 +1,6 @@
 import unittest
 import math
+import tempfile
 
 import lsst.utils.tests
 import lsst.geom
@@ -56,6 +57,22 @@ class RingsTestCase(skyMapTestCase.SkyMapTestCase):
             for coord in vertices:
                 self.assertIn(tract.getId(), [tt.getId() for tt in skymap.findAllTracts(coord)])
 
+    def testFindAllTractIdArray(self):
+        """Test that findAllTractIdArray agrees with findAllTracts"""
+        skymap = self.getSkyMap()
+        coordList = [vertex for tract in skymap for vertex in tract.getVertexList()]
+        coordList += [lsst.geom.SpherePoint(ra, dec, lsst.geom.degrees) for
+                      ra, dec in ((0, 90), (123, -90), (359.9, 0.0))]
+        ra = [coord.getRa().asDegrees() for coord in coordList]
+        dec = [coord.getDec().asDegrees() for coord in coordList]
+        candidates = skymap.findAllTractCandidateIdArray(ra, dec, degrees=True)
+        tractIdArray = skymap.findAllTractIdArray(ra, dec, degrees=True)
+        self.assertEqual(tractIdArray.shape, candidates.shape)
+        for coord, row, candidateRow in zip(coordList, tractIdArray, candidates):
+            expect = [tract.getId() for tract in skymap.findAllTracts(coord)]
+            self.assertEqual([tractId for tractId in row if tractId >= 0], expect)
+            self.assertTrue(set(expect).issubset(candidateRow))
+
 
 class NonzeroRaStartRingsTestCase(RingsTestCase):
     """Test that setting raStart != 0 works"""
@@ -122,6 +139,39 @@ class HscRingsTestCase(lsst.utils.tests.TestCase):
             foundTractId = self.skymap.findTract(coord).getId()
             self.assertEqual(tractId, foundTractId)
 
+    def testRingIndices(self):
+        """Check getRingIndices against a direct walk over the rings"""
+        numRings = self.skymap.config.numRings
+        ringNums = self.skymap._ringNums
+        for index in range(1, len(self.skymap) - 1):
+            ring = 0
+            tractNum = index - 1
+            if self.skymap._version == 0:
+                while ring < numRings and tractNum > ringNums[ring]:
+                    tractNum -= ringNums[ring]
+                    ring += 1
+            else:
+                while ring < numRings and tractNum >= ringNums[ring]:
+                    tractNum -= ringNums[ring]
+                    ring += 1
+            self.assertEqual(self.skymap.getRingIndices(index), (ring, tractNum))
+        self.assertEqual(self.skymap.getRingIndices(0), (-1, 0))
+        self.assertEqual(self.skymap.getRingIndices(len(self.skymap) - 1), (numRings, 0))
+
+    def testDiskCacheVersion(self):
+        """Test that sky maps of different versions sharing a disk cache do
+        not read each other's tracts
+        """
+        index = self.skymap._ringNums[0] + 1  # Duplicates tract 1 in version=0
+        expect = {version: RingsSkyMap(self.getConfig(), version=version)[index].getCtrCoord()
+                  for version in (0, 1)}
+        self.assertNotEqual(expect[0], expect[1])
+        with tempfile.TemporaryDirectory() as directory:
+            for version in (0, 1, 0, 1):
+                skymap = RingsSkyMap(self.getConfig(), version=version)
+                skymap.configureDiskCache(directory)
+                self.assertEqual(skymap[index].getCtrCoord(), expect[version])
+
     def getFirstTractLastRingCoord(self):
         """Return the coordinates of the first tract in the last ring
 
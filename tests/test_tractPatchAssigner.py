@@ -0,0 +1,122 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsst.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+"""Test TractPatchAssigner class
+"""
+import unittest
+
+import numpy as np
+
+import lsst.geom as geom
+import lsst.utils.tests
+
+from lsst.skymap import TractPatchAssigner, ParallelTractPatchAssigner, EquatSkyMap
+from lsst.skymap.ringsSkyMap import RingsSkyMap
+
+
+class TractPatchAssignerTestCase(lsst.utils.tests.TestCase):
+
+    def setUp(self):
+        np.random.seed(47)
+        config = RingsSkyMap.ConfigClass()
+        config.numRings = 3
+        self.config = config
+        self.assigner = TractPatchAssigner.fromRegistry("rings", config, chunkSize=7)
+        self.ra = np.random.uniform(0.0, 360.0, size=50)
+        self.dec = np.degrees(np.arcsin(np.random.uniform(-1.0, 1.0, size=50)))
+        self.ra[3] = np.nan
+
+    def testAssign(self):
+        """Test that assign agrees with findTract and findPatch"""
+        skyMap = self.assigner.skyMap
+        self.assertEqual(skyMap, RingsSkyMap(self.config))
+        result = self.assigner.assign(self.ra, self.dec, degrees=True)
+        self.assertEqual(result.dtype, TractPatchAssigner.dtype)
+        self.assertEqual(len(result), len(self.ra))
+        for ra, dec, row in zip(self.ra, self.dec, result):
+            if not np.isfinite(ra):
+                self.assertEqual(tuple(row), (-1, -1, -1, -1))
+                continue
+            coord = geom.SpherePoint(ra, dec, geom.degrees)
+            tractInfo = skyMap.findTract(coord)
+            self.assertEqual(row["tract"], tractInfo.getId())
+            try:
+                patchInfo = tractInfo.findPatch(coord)
+            except LookupError:
+                self.assertEqual((row["patch_x"], row["patch_y"], row["patch"]), (-1, -1, -1))
+                continue
+            self.assertEqual((row["patch_x"], row["patch_y"]), patchInfo.getIndex())
+            self.assertEqual(row["patch"], tractInfo.getSequentialPatchIndex(patchInfo))
+
+        # Radians, and writing into a supplied array
+        out = np.zeros(len(self.ra), dtype=TractPatchAssigner.dtype)
+        self.assertIs(self.assigner.assign(np.radians(self.ra), np.radians(self.dec), out=out), out)
+        np.testing.assert_array_equal(out, result)
+
+        with self.assertRaises(ValueError):
+            self.assigner.assign(self.ra, self.dec[:-1], degrees=True)
+        with self.assertRaises(ValueError):
+            self.assigner.assign(self.ra, self.dec, degrees=True, out=out[:-1])
+
+    def testAssignChunks(self):
+        """Test that assigning in chunks agrees with assigning all at once"""
+        expect = self.assigner.assign(self.ra, self.dec, degrees=True)
+        bounds = [0, 5, 5, 30, 50]
+        chunks = ((self.ra[start:stop], self.dec[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:]))
+        results = list(self.assigner.assignChunks(chunks, degrees=True))
+        self.assertEqual([len(result) for result in results], [5, 0, 25, 20])
+        np.testing.assert_array_equal(np.concatenate(results), expect)
+
+    def testFromRegistry(self):
+        """Test construction from the registry with the default config"""
+        assigner = TractPatchAssigner.fromRegistry("equat")
+        self.assertEqual(assigner.skyMap, EquatSkyMap())
+        with self.assertRaises(ValueError):
+            TractPatchAssigner(assigner.skyMap, chunkSize=0)
+
+    def testParallel(self):
+        """Test that assigning with worker processes agrees with assigning
+        serially
+        """
+        expect = self.assigner.assign(self.ra, self.dec, degrees=True)
+        for numWorkers in (1, 2):
+            with ParallelTractPatchAssigner(self.assigner.skyMap, chunkSize=7,
+                                            numWorkers=numWorkers) as assigner:
+                np.testing.assert_array_equal(assigner.assign(self.ra, self.dec, degrees=True), expect)
+                # Fewer rows than chunkSize are assigned in this process
+                np.testing.assert_array_equal(assigner.assign(self.ra[:5], self.dec[:5], degrees=True),
+                                              expect[:5])
+            self.assertIsNone(assigner._executor)
+        with self.assertRaises(ValueError):
+            ParallelTractPatchAssigner(self.assigner.skyMap, numWorkers=0)
+
+
+class MemoryTester(lsst.utils.tests.MemoryTestCase):
+    pass
+
+
+def setup_module(module):
+    lsst.utils.tests.init()
+
+
+if __name__ == "__main__":
+    lsst.utils.tests.init()
+    unittest.main()